@@ -0,0 +1,568 @@
+/*
+ * Laços internos do LZW compilados em C (módulo opcional LZW._lzw_accel).
+ *
+ * Implementa o mesmo algoritmo dos laços em Python de LZWCompressor._encode e do backend
+ * "dict" de LZWDecoder.decompress, gerando exatamente os mesmos códigos e bytes:
+ *
+ *   Encoder  tabela (prefixo << 8) | byte -> código em endereçamento aberto, com o mesmo
+ *            estado do LZWCompressor (código livre, reinício com CLEAR); as políticas e os
+ *            contadores continuam em Python.
+ *   decode   descompressão de uma lista de códigos; cada entrada nova é guardada como
+ *            (posição na saída, comprimento), como no backend "array".
+ *
+ * Compilação: python LZW/build_accel.py
+ */
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <stdint.h>
+#include <string.h>
+
+#define CLEAR_CODE 256
+#define MIN_CAPACITY 1024
+
+/* ----------------- Vetor de códigos ----------------- */
+
+typedef struct {
+    int64_t *items;
+    Py_ssize_t size;
+    Py_ssize_t capacity;
+} CodeBuffer;
+
+static int
+code_buffer_push(CodeBuffer *buffer, int64_t code)
+{
+    if (buffer->size == buffer->capacity) {
+        Py_ssize_t capacity = buffer->capacity ? buffer->capacity * 2 : 1024;
+        int64_t *items = PyMem_Realloc(buffer->items, (size_t)capacity * sizeof(int64_t));
+        if (items == NULL) {
+            PyErr_NoMemory();
+            return -1;
+        }
+        buffer->items = items;
+        buffer->capacity = capacity;
+    }
+    buffer->items[buffer->size++] = code;
+    return 0;
+}
+
+static PyObject *
+code_buffer_to_list(CodeBuffer *buffer)
+{
+    PyObject *list = PyList_New(buffer->size);
+    if (list == NULL)
+        return NULL;
+    for (Py_ssize_t i = 0; i < buffer->size; i++) {
+        PyObject *code = PyLong_FromLongLong(buffer->items[i]);
+        if (code == NULL) {
+            Py_DECREF(list);
+            return NULL;
+        }
+        PyList_SET_ITEM(list, i, code);
+    }
+    return list;
+}
+
+/* ----------------- Codificador ----------------- */
+
+typedef struct {
+    PyObject_HEAD
+    uint64_t *keys;       /* (prefixo << 8) | byte */
+    int64_t *values;      /* Código da entrada */
+    uint32_t *stamps;     /* Posição ocupada quando igual a generation; reiniciar a tabela é trocar a geração */
+    size_t capacity;      /* Potência de dois */
+    size_t count;
+    uint32_t generation;
+    int64_t max_table_size;
+    int64_t first_code;
+    int64_t next_code;
+    int reset_when_full;
+    uint64_t *initial_keys;  /* Entradas do dicionário pré-definido, restauradas a cada reinício */
+    int64_t *initial_values;
+    Py_ssize_t initial_count;
+} EncoderObject;
+
+static inline size_t
+slot_for(uint64_t key, size_t mask)
+{
+    return (size_t)((key * 0x9E3779B97F4A7C15ULL) >> 17) & mask;
+}
+
+static int
+encoder_allocate(EncoderObject *self, size_t capacity)
+{
+    uint64_t *keys = PyMem_Malloc(capacity * sizeof(uint64_t));
+    int64_t *values = PyMem_Malloc(capacity * sizeof(int64_t));
+    uint32_t *stamps = PyMem_Calloc(capacity, sizeof(uint32_t));
+    if (keys == NULL || values == NULL || stamps == NULL) {
+        PyMem_Free(keys);
+        PyMem_Free(values);
+        PyMem_Free(stamps);
+        PyErr_NoMemory();
+        return -1;
+    }
+    self->keys = keys;
+    self->values = values;
+    self->stamps = stamps;
+    self->capacity = capacity;
+    self->count = 0;
+    self->generation = 1;
+    return 0;
+}
+
+static inline void
+encoder_put(EncoderObject *self, uint64_t key, int64_t value)
+{
+    size_t mask = self->capacity - 1;
+    size_t slot = slot_for(key, mask);
+    while (self->stamps[slot] == self->generation) {
+        if (self->keys[slot] == key) {
+            self->values[slot] = value;
+            return;
+        }
+        slot = (slot + 1) & mask;
+    }
+    self->stamps[slot] = self->generation;
+    self->keys[slot] = key;
+    self->values[slot] = value;
+    self->count++;
+}
+
+static int
+encoder_grow(EncoderObject *self)
+{
+    uint64_t *keys = self->keys;
+    int64_t *values = self->values;
+    uint32_t *stamps = self->stamps;
+    size_t capacity = self->capacity;
+    uint32_t generation = self->generation;
+
+    if (encoder_allocate(self, capacity * 2) < 0) {
+        self->keys = keys;
+        self->values = values;
+        self->stamps = stamps;
+        return -1;
+    }
+    for (size_t slot = 0; slot < capacity; slot++) {
+        if (stamps[slot] == generation)
+            encoder_put(self, keys[slot], values[slot]);
+    }
+    PyMem_Free(keys);
+    PyMem_Free(values);
+    PyMem_Free(stamps);
+    return 0;
+}
+
+static inline int
+encoder_insert(EncoderObject *self, uint64_t key, int64_t value)
+{
+    /* Carga máxima de 50%, para manter curtas as sequências de sondagem */
+    if ((self->count + 1) * 2 > self->capacity && encoder_grow(self) < 0)
+        return -1;
+    encoder_put(self, key, value);
+    return 0;
+}
+
+static inline int64_t
+encoder_get(EncoderObject *self, uint64_t key)
+{
+    size_t mask = self->capacity - 1;
+    size_t slot = slot_for(key, mask);
+    while (self->stamps[slot] == self->generation) {
+        if (self->keys[slot] == key)
+            return self->values[slot];
+        slot = (slot + 1) & mask;
+    }
+    return -1;
+}
+
+static int
+encoder_restore(EncoderObject *self)
+{
+    /* Volta ao dicionário inicial: as posições da geração anterior deixam de valer */
+    self->generation++;
+    if (self->generation == 0) {
+        memset(self->stamps, 0, self->capacity * sizeof(uint32_t));
+        self->generation = 1;
+    }
+    self->count = 0;
+    for (Py_ssize_t i = 0; i < self->initial_count; i++) {
+        if (encoder_insert(self, self->initial_keys[i], self->initial_values[i]) < 0)
+            return -1;
+    }
+    self->next_code = self->first_code;
+    return 0;
+}
+
+static int
+Encoder_init(EncoderObject *self, PyObject *args, PyObject *kwds)
+{
+    static char *kwlist[] = {"max_bits", "first_code", "initial_table", "reset_when_full", NULL};
+    int max_bits;
+    long long first_code;
+    PyObject *initial_table;
+    int reset_when_full;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "iLO!p", kwlist, &max_bits, &first_code,
+                                     &PyDict_Type, &initial_table, &reset_when_full))
+        return -1;
+    if (max_bits < 1 || first_code < 0) {
+        PyErr_SetString(PyExc_ValueError, "max_bits e first_code devem ser positivos.");
+        return -1;
+    }
+    self->max_table_size = max_bits >= 62 ? INT64_MAX : (int64_t)1 << max_bits;
+    self->first_code = first_code;
+    self->reset_when_full = reset_when_full;
+
+    Py_ssize_t count = PyDict_Size(initial_table);
+    PyMem_Free(self->initial_keys);
+    PyMem_Free(self->initial_values);
+    self->initial_keys = PyMem_Malloc((size_t)(count ? count : 1) * sizeof(uint64_t));
+    self->initial_values = PyMem_Malloc((size_t)(count ? count : 1) * sizeof(int64_t));
+    if (self->initial_keys == NULL || self->initial_values == NULL) {
+        PyErr_NoMemory();
+        return -1;
+    }
+    Py_ssize_t position = 0;
+    Py_ssize_t index = 0;
+    PyObject *key, *value;
+    while (PyDict_Next(initial_table, &position, &key, &value)) {
+        unsigned long long packed_key = PyLong_AsUnsignedLongLong(key);
+        long long code = PyLong_AsLongLong(value);
+        if (PyErr_Occurred())
+            return -1;
+        self->initial_keys[index] = packed_key;
+        self->initial_values[index] = code;
+        index++;
+    }
+    self->initial_count = index;
+
+    size_t capacity = MIN_CAPACITY;
+    while (capacity < (size_t)index * 2)
+        capacity *= 2;
+    PyMem_Free(self->keys);
+    PyMem_Free(self->values);
+    PyMem_Free(self->stamps);
+    self->keys = NULL;
+    self->values = NULL;
+    self->stamps = NULL;
+    if (encoder_allocate(self, capacity) < 0)
+        return -1;
+    return encoder_restore(self);
+}
+
+static void
+Encoder_dealloc(EncoderObject *self)
+{
+    PyMem_Free(self->keys);
+    PyMem_Free(self->values);
+    PyMem_Free(self->stamps);
+    PyMem_Free(self->initial_keys);
+    PyMem_Free(self->initial_values);
+    Py_TYPE(self)->tp_free((PyObject *)self);
+}
+
+PyDoc_STRVAR(Encoder_encode_doc,
+"encode(data, prefix) -> (codes, prefix, clears, fill)\n\n"
+"Processa os bytes de ``data`` a partir da sequência pendente ``prefix`` (-1 se não houver).\n"
+"Retorna os códigos emitidos, a nova sequência pendente, quantos CLEAR foram emitidos e\n"
+"quantos códigos haviam sido emitidos quando a tabela encheu pela primeira vez (-1 se não encheu).");
+
+static PyObject *
+Encoder_encode(EncoderObject *self, PyObject *args)
+{
+    Py_buffer view;
+    long long prefix;
+    if (!PyArg_ParseTuple(args, "y*L", &view, &prefix))
+        return NULL;
+
+    const unsigned char *data = view.buf;
+    Py_ssize_t length = view.len;
+    Py_ssize_t start = 0;
+    CodeBuffer codes = {NULL, 0, 0};
+    Py_ssize_t clears = 0;
+    Py_ssize_t fill = -1;
+    int64_t next_code = self->next_code;
+    const int64_t max_table_size = self->max_table_size;
+
+    if (prefix < 0 && length > 0)
+        prefix = data[start++];  /* O primeiro byte apenas inicia a sequência */
+
+    for (Py_ssize_t i = start; i < length; i++) {
+        unsigned char byte = data[i];
+        uint64_t key = ((uint64_t)prefix << 8) | byte;
+        int64_t code = encoder_get(self, key);
+        if (code >= 0) {
+            prefix = code;
+            continue;
+        }
+        if (code_buffer_push(&codes, prefix) < 0)
+            goto error;
+        if (next_code < max_table_size) {
+            if (encoder_insert(self, key, next_code) < 0)
+                goto error;
+            next_code++;
+            if (next_code == max_table_size && fill < 0)
+                fill = codes.size;
+        }
+        else if (self->reset_when_full) {
+            /* Tabela cheia: sinaliza o reinício e recomeça com o dicionário inicial */
+            if (code_buffer_push(&codes, CLEAR_CODE) < 0 || encoder_restore(self) < 0)
+                goto error;
+            clears++;
+            next_code = self->first_code;
+        }
+        prefix = byte;
+    }
+    self->next_code = next_code;
+    PyBuffer_Release(&view);
+
+    PyObject *list = code_buffer_to_list(&codes);
+    PyMem_Free(codes.items);
+    if (list == NULL)
+        return NULL;
+    return Py_BuildValue("(NLnn)", list, prefix, clears, fill);
+
+error:
+    self->next_code = next_code;
+    PyBuffer_Release(&view);
+    PyMem_Free(codes.items);
+    return NULL;
+}
+
+PyDoc_STRVAR(Encoder_reset_doc, "reset()\n\nVolta ao dicionário inicial (política adaptativa).");
+
+static PyObject *
+Encoder_reset(EncoderObject *self, PyObject *Py_UNUSED(ignored))
+{
+    if (encoder_restore(self) < 0)
+        return NULL;
+    Py_RETURN_NONE;
+}
+
+static PyObject *
+Encoder_get_next_code(EncoderObject *self, void *Py_UNUSED(closure))
+{
+    return PyLong_FromLongLong(self->next_code);
+}
+
+static PyMethodDef Encoder_methods[] = {
+    {"encode", (PyCFunction)Encoder_encode, METH_VARARGS, Encoder_encode_doc},
+    {"reset", (PyCFunction)Encoder_reset, METH_NOARGS, Encoder_reset_doc},
+    {NULL, NULL, 0, NULL},
+};
+
+static PyGetSetDef Encoder_getset[] = {
+    {"next_code", (getter)Encoder_get_next_code, NULL, "Próximo código livre.", NULL},
+    {NULL, NULL, NULL, NULL, NULL},
+};
+
+static PyTypeObject EncoderType = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "_lzw_accel.Encoder",
+    .tp_doc = PyDoc_STR("Encoder(max_bits, first_code, initial_table, reset_when_full)\n\n"
+                        "Tabela do codificador LZW; ``initial_table`` é a tabela inicial do LZWCompressor."),
+    .tp_basicsize = sizeof(EncoderObject),
+    .tp_flags = Py_TPFLAGS_DEFAULT,
+    .tp_new = PyType_GenericNew,
+    .tp_init = (initproc)Encoder_init,
+    .tp_dealloc = (destructor)Encoder_dealloc,
+    .tp_methods = Encoder_methods,
+    .tp_getset = Encoder_getset,
+};
+
+/* ----------------- Decodificador ----------------- */
+
+#define DECODE_RESERVE_LIMIT ((size_t)1 << 26)  /* Maior pré-alocação inicial da saída (64 MiB) */
+
+typedef struct {
+    unsigned char *data;
+    size_t size;
+    size_t capacity;
+} ByteBuffer;
+
+static inline int
+byte_buffer_reserve(ByteBuffer *buffer, size_t extra)
+{
+    if (buffer->size + extra <= buffer->capacity)
+        return 0;
+    size_t capacity = buffer->capacity ? buffer->capacity : 4096;
+    while (capacity < buffer->size + extra)
+        capacity *= 2;
+    unsigned char *data = PyMem_Realloc(buffer->data, capacity);
+    if (data == NULL) {
+        PyErr_NoMemory();
+        return -1;
+    }
+    buffer->data = data;
+    buffer->capacity = capacity;
+    return 0;
+}
+
+PyDoc_STRVAR(decode_doc,
+"decode(codes, max_bits, clear_code, initial_entries, size=0) -> (data, clears, misses, fill)\n\n"
+"Descomprime a lista de códigos a partir do dicionário inicial ``initial_entries`` (lista de bytes,\n"
+"com None no lugar do CLEAR). ``clear_code`` é -1 sem CLEAR e ``size`` é o tamanho esperado, usado\n"
+"só para pré-alocar a saída (até 64 MiB). Retorna os bytes, quantos CLEAR foram lidos, quantos\n"
+"códigos ainda não estavam no dicionário e quantas sequências haviam sido emitidas quando a tabela\n"
+"encheu (-1 se não encheu).");
+
+static PyObject *
+decode(PyObject *Py_UNUSED(module), PyObject *args, PyObject *kwds)
+{
+    static char *kwlist[] = {"codes", "max_bits", "clear_code", "initial_entries", "size", NULL};
+    PyObject *codes_object;
+    int max_bits;
+    long long clear_code;
+    PyObject *initial_object;
+    Py_ssize_t size_hint = 0;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "OiLO!|n", kwlist, &codes_object, &max_bits, &clear_code,
+                                     &PyList_Type, &initial_object, &size_hint))
+        return NULL;
+
+    PyObject *codes = PySequence_Fast(codes_object, "codes deve ser uma sequência de inteiros.");
+    if (codes == NULL)
+        return NULL;
+    Py_ssize_t count = PySequence_Fast_GET_SIZE(codes);
+    PyObject **items = PySequence_Fast_ITEMS(codes);
+    Py_ssize_t first_code = PyList_GET_SIZE(initial_object);
+    const int64_t max_table_size = max_bits >= 62 ? INT64_MAX : (int64_t)1 << max_bits;
+
+    /* Entradas criadas durante a descompressão: no máximo uma por código lido e nunca mais que as
+       posições livres da tabela */
+    int64_t table_entries = max_table_size > first_code ? max_table_size - first_code : 0;
+    size_t capacity = (size_t)(count < table_entries ? count : table_entries);
+    if (capacity == 0)
+        capacity = 1;
+    size_t *offsets = PyMem_Malloc(capacity * sizeof(size_t));
+    size_t *lengths = PyMem_Malloc(capacity * sizeof(size_t));
+    ByteBuffer output = {NULL, 0, 0};
+    Py_ssize_t entries = 0;
+    Py_ssize_t emitted = 0;
+    Py_ssize_t clears = 0;
+    Py_ssize_t misses = 0;
+    Py_ssize_t fill = -1;
+    size_t previous_offset = 0;
+    size_t previous_length = 0;  /* Zero: nenhuma sequência anterior */
+
+    if (offsets == NULL || lengths == NULL) {
+        PyErr_NoMemory();
+        goto error;
+    }
+    /* O tamanho vem do cabeçalho e pode estar corrompido: acima do limite, a saída cresce por duplicação */
+    size_t reserve = size_hint > 0 ? (size_t)size_hint : (size_t)count * 2 + 1;
+    if (byte_buffer_reserve(&output, reserve < DECODE_RESERVE_LIMIT ? reserve : DECODE_RESERVE_LIMIT) < 0)
+        goto error;
+
+    for (Py_ssize_t i = 0; i < count; i++) {
+        long long code = PyLong_AsLongLong(items[i]);
+        if (code == -1 && PyErr_Occurred())
+            goto error;
+        if (code == clear_code) {
+            /* O codificador reiniciou o dicionário: descarta as entradas criadas desde o início */
+            entries = 0;
+            previous_length = 0;
+            clears++;
+            continue;
+        }
+        if (code < 0) {
+            PyErr_Format(PyExc_ValueError, "Código inválido: %lld.", code);
+            goto error;
+        }
+
+        size_t position = output.size;
+        size_t length;
+        if (code < first_code) {
+            PyObject *entry = PyList_GET_ITEM(initial_object, code);
+            if (!PyBytes_Check(entry)) {
+                PyErr_Format(PyExc_ValueError, "Código sem sequência no dicionário inicial: %lld.", code);
+                goto error;
+            }
+            length = (size_t)PyBytes_GET_SIZE(entry);
+            if (byte_buffer_reserve(&output, length) < 0)
+                goto error;
+            memcpy(output.data + position, PyBytes_AS_STRING(entry), length);
+        }
+        else if (code - first_code < entries) {
+            length = lengths[code - first_code];
+            if (byte_buffer_reserve(&output, length) < 0)
+                goto error;
+            /* A sequência já está na saída, antes da posição atual */
+            memcpy(output.data + position, output.data + offsets[code - first_code], length);
+        }
+        else if (previous_length) {
+            /* Código ainda não está no dicionário (caso cScSc): anterior + seu primeiro byte */
+            length = previous_length + 1;
+            if (byte_buffer_reserve(&output, length) < 0)
+                goto error;
+            memcpy(output.data + position, output.data + previous_offset, previous_length);
+            output.data[position + previous_length] = output.data[previous_offset];
+            misses++;
+        }
+        else {
+            length = 1;
+            if (byte_buffer_reserve(&output, 1) < 0)
+                goto error;
+            output.data[position] = (unsigned char)(code % 256);  /* Entrada padrão, como no backend "dict" */
+        }
+        output.size += length;
+        emitted++;
+
+        /* A nova entrada é a sequência anterior seguida do primeiro byte desta, já escrito logo depois dela */
+        if (previous_length && first_code + entries < max_table_size) {
+            offsets[entries] = previous_offset;
+            lengths[entries] = previous_length + 1;
+            entries++;
+            if (first_code + entries == max_table_size && fill < 0)
+                fill = emitted;
+        }
+        previous_offset = position;
+        previous_length = length;
+    }
+
+    Py_DECREF(codes);
+    PyMem_Free(offsets);
+    PyMem_Free(lengths);
+    PyObject *data = PyBytes_FromStringAndSize((const char *)output.data, (Py_ssize_t)output.size);
+    PyMem_Free(output.data);
+    if (data == NULL)
+        return NULL;
+    return Py_BuildValue("(Nnnn)", data, clears, misses, fill);
+
+error:
+    Py_DECREF(codes);
+    PyMem_Free(offsets);
+    PyMem_Free(lengths);
+    PyMem_Free(output.data);
+    return NULL;
+}
+
+static PyMethodDef module_methods[] = {
+    {"decode", (PyCFunction)(void (*)(void))decode, METH_VARARGS | METH_KEYWORDS, decode_doc},
+    {NULL, NULL, 0, NULL},
+};
+
+static struct PyModuleDef module = {
+    PyModuleDef_HEAD_INIT,
+    .m_name = "_lzw_accel",
+    .m_doc = "Laços internos do codificador e do decodificador LZW compilados em C.",
+    .m_size = -1,
+    .m_methods = module_methods,
+};
+
+PyMODINIT_FUNC
+PyInit__lzw_accel(void)
+{
+    if (PyType_Ready(&EncoderType) < 0)
+        return NULL;
+    PyObject *m = PyModule_Create(&module);
+    if (m == NULL)
+        return NULL;
+    Py_INCREF(&EncoderType);
+    if (PyModule_AddObject(m, "Encoder", (PyObject *)&EncoderType) < 0) {
+        Py_DECREF(&EncoderType);
+        Py_DECREF(m);
+        return NULL;
+    }
+    return m;
+}
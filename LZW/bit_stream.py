@@ -0,0 +1,315 @@
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: sem ele o empacotamento usa apenas Python puro
+    np = None
+
+MIN_CODE_BITS = 9  # Largura inicial dos códigos, como no LZW clássico
+MAX_CODE_BITS = 63  # Maior largura aceita: os códigos cabem em inteiros de 64 bits (NumPy e módulo compilado)
+STORED_MAX_BITS = 8  # max_bits que marca conteúdo armazenado sem compressão: cada código é um byte original
+FIRST_CODE = 256  # Primeiro código livre após os caracteres ASCII
+
+_FLUSH_BITS = 1024  # Quantidade de bits acumulados antes de converter para bytes
+_NUMPY_MIN_CODES = 4096  # Abaixo disso o caminho em Python puro é mais rápido
+_NUMPY_CHUNK_CODES = 1 << 16  # Códigos convertidos por vez no caminho vetorizado
+
+
+def validate_max_bits(max_bits, allow_stored=False):
+    """Garante que max_bits está entre MIN_CODE_BITS e MAX_CODE_BITS (ou é STORED_MAX_BITS, com ``allow_stored``)."""
+    if allow_stored and max_bits == STORED_MAX_BITS:
+        return max_bits
+    if not MIN_CODE_BITS <= max_bits <= MAX_CODE_BITS:
+        raise ValueError(f"max_bits deve estar entre {MIN_CODE_BITS} e {MAX_CODE_BITS}, recebido {max_bits}.")
+    return max_bits
+
+
+def code_width(position, max_bits, first_code=FIRST_CODE):
+    """Largura em bits do código emitido na posição dada do fluxo.
+
+    Na posição ``i`` o maior código possível é ``first_code - 1 + i``, pois cada
+    código emitido (exceto o primeiro) acrescenta no máximo uma entrada ao dicionário.
+    Codificador e decodificador calculam a mesma largura sem trocar informação extra.
+    """
+    return min(max_bits, max(MIN_CODE_BITS, (first_code - 1 + position).bit_length()))
+
+
+def _next_growth(width, max_bits, first_code):
+    """Primeira posição em que a largura passa de ``width`` para ``width + 1``."""
+    if width >= max_bits:
+        return float("inf")
+    return (1 << width) - first_code + 1
+
+
+def _packed_bits(count, max_bits, first_code):
+    """Total de bits ocupado por ``count`` códigos consecutivos a partir da posição zero."""
+    total_bits = 0
+    position = 0
+    while position < count:
+        width = code_width(position, max_bits, first_code)
+        end = min(count, _next_growth(width, max_bits, first_code))
+        total_bits += (end - position) * width
+        position = end
+    return total_bits
+
+
+def packed_size(codes, max_bits, first_code=FIRST_CODE, clear_code=None):
+    """Tamanho em bytes da lista de códigos empacotada, sem empacotá-la.
+
+    Cada código CLEAR reinicia a contagem de posições e, portanto, a largura.
+    """
+    total_bits = 0
+    start = 0
+    if clear_code is not None:
+        try:
+            while True:
+                end = codes.index(clear_code, start) + 1
+                total_bits += _packed_bits(end - start, max_bits, first_code)
+                start = end
+        except ValueError:
+            pass
+    total_bits += _packed_bits(len(codes) - start, max_bits, first_code)
+    return (total_bits + 7) // 8
+
+
+def width_counts(codes, max_bits, first_code=FIRST_CODE, clear_code=None):
+    """Quantidade de códigos emitidos em cada largura de bits, sem percorrer os códigos um a um."""
+    counts = {}
+    segments = []
+    start = 0
+    if clear_code is not None:
+        try:
+            while True:
+                end = codes.index(clear_code, start) + 1
+                segments.append(end - start)
+                start = end
+        except ValueError:
+            pass
+    segments.append(len(codes) - start)
+
+    for count in segments:
+        position = 0
+        while position < count:
+            width = code_width(position, max_bits, first_code)
+            end = min(count, _next_growth(width, max_bits, first_code))
+            counts[width] = counts.get(width, 0) + end - position
+            position = end
+    return counts
+
+
+class BitWriter:
+    """Empacota códigos LZW de largura crescente (9 bits até max_bits) em bytes, de forma incremental.
+
+    Após um código CLEAR a largura volta ao valor inicial, acompanhando o reinício do dicionário.
+    """
+
+    def __init__(self, max_bits, first_code=FIRST_CODE, clear_code=None):
+        self.max_bits = max_bits
+        self.first_code = first_code
+        self.clear_code = clear_code
+        self.position = 0
+        self._accumulator = 0
+        self._bit_count = 0
+
+    def write(self, codes, output=None):
+        """Empacota uma lista de códigos e retorna os bytes completos já disponíveis.
+
+        Se ``output`` (um bytearray) for informado, os bytes são acrescentados diretamente
+        a ele, sem buffer intermediário, e ele próprio é retornado.
+        """
+        max_bits = self.max_bits
+        first_code = self.first_code
+        clear_code = self.clear_code
+        accumulator = self._accumulator
+        bit_count = self._bit_count
+        position = self.position
+        width = code_width(position, max_bits, first_code)
+        growth = _next_growth(width, max_bits, first_code)
+        initial_width = code_width(0, max_bits, first_code)
+        initial_growth = _next_growth(initial_width, max_bits, first_code)
+        if output is None:
+            output = bytearray()
+
+        for code in codes:
+            if position >= growth:
+                width += 1
+                growth = _next_growth(width, max_bits, first_code)
+            accumulator = (accumulator << width) | code
+            bit_count += width
+            position += 1
+            if code == clear_code:
+                position, width, growth = 0, initial_width, initial_growth
+            if bit_count >= _FLUSH_BITS:
+                # Converte todos os bytes completos de uma só vez
+                remainder = bit_count & 7
+                output += (accumulator >> remainder).to_bytes((bit_count - remainder) >> 3, "big")
+                accumulator &= (1 << remainder) - 1
+                bit_count = remainder
+
+        remainder = bit_count & 7
+        if bit_count > remainder:
+            output += (accumulator >> remainder).to_bytes((bit_count - remainder) >> 3, "big")
+            accumulator &= (1 << remainder) - 1
+            bit_count = remainder
+
+        self._accumulator = accumulator
+        self._bit_count = bit_count
+        self.position = position
+        return output
+
+    def flush(self):
+        """Retorna os bits pendentes, completando o último byte com zeros."""
+        if not self._bit_count:
+            return b""
+        padding = 8 - self._bit_count
+        output = (self._accumulator << padding).to_bytes(1, "big")
+        self._accumulator = 0
+        self._bit_count = 0
+        return output
+
+
+class BitReader:
+    """Desempacota bytes em códigos LZW de largura crescente, de forma incremental."""
+
+    def __init__(self, max_bits, first_code=FIRST_CODE, clear_code=None):
+        self.max_bits = max_bits
+        self.first_code = first_code
+        self.clear_code = clear_code
+        self.position = 0
+        self._accumulator = 0
+        self._bit_count = 0
+
+    def read(self, data):
+        """Desempacota um bloco de bytes e retorna os códigos completos contidos nele."""
+        max_bits = self.max_bits
+        first_code = self.first_code
+        clear_code = self.clear_code
+        accumulator = self._accumulator
+        bit_count = self._bit_count
+        position = self.position
+        width = code_width(position, max_bits, first_code)
+        growth = _next_growth(width, max_bits, first_code)
+        initial_width = code_width(0, max_bits, first_code)
+        initial_growth = _next_growth(initial_width, max_bits, first_code)
+        codes = []
+
+        data = memoryview(data).cast("B")
+        size = len(data)
+        # Lê 8 bytes por vez para reduzir o número de operações por código
+        for start in range(0, size, 8):
+            chunk = data[start:start + 8]
+            accumulator = (accumulator << (len(chunk) << 3)) | int.from_bytes(chunk, "big")
+            bit_count += len(chunk) << 3
+            while bit_count >= width:
+                bit_count -= width
+                code = accumulator >> bit_count
+                codes.append(code)
+                accumulator &= (1 << bit_count) - 1
+                position += 1
+                if code == clear_code:
+                    position, width, growth = 0, initial_width, initial_growth
+                elif position >= growth:
+                    width += 1
+                    growth = _next_growth(width, max_bits, first_code)
+
+        self._accumulator = accumulator
+        self._bit_count = bit_count
+        self.position = position
+        return codes
+
+
+def pack_codes(codes, max_bits, first_code=FIRST_CODE, clear_code=None):
+    """Empacota uma lista completa de códigos em bytes (vetorizado com NumPy, quando disponível)."""
+    if max_bits == STORED_MAX_BITS:
+        return bytes(codes)  # Conteúdo armazenado: os códigos de 8 bits são os próprios bytes
+    if np is not None and len(codes) >= _NUMPY_MIN_CODES:
+        return _pack_codes_numpy(codes, max_bits, first_code, clear_code)
+    writer = BitWriter(max_bits, first_code, clear_code)
+    output = writer.write(codes)
+    output += writer.flush()
+    return output
+
+
+def unpack_codes(data, max_bits, first_code=FIRST_CODE, clear_code=None):
+    """Desempacota todos os códigos contidos em ``data``; os bits de preenchimento finais são ignorados.
+
+    ``data`` pode ser qualquer objeto com protocolo de buffer (por exemplo, um mmap),
+    lido sem cópia.
+    """
+    if max_bits == STORED_MAX_BITS:
+        return list(bytes(data))  # Conteúdo armazenado: cada byte já é um código, sem passar pelo BitReader
+    if np is not None and len(data) * 8 >= _NUMPY_MIN_CODES * MIN_CODE_BITS:
+        return _unpack_codes_numpy(data, max_bits, first_code, clear_code)
+    return BitReader(max_bits, first_code, clear_code).read(data)
+
+
+def _growth_positions(max_bits, first_code):
+    """Posições (a partir do início ou do último CLEAR) em que a largura aumenta um bit."""
+    width = code_width(0, max_bits, first_code)
+    return [_next_growth(bits, max_bits, first_code) for bits in range(width, max_bits)]
+
+
+def _pack_codes_numpy(codes, max_bits, first_code, clear_code):
+    """Empacotamento vetorizado: expande cada código em bits e junta tudo com ``np.packbits``."""
+    codes = np.asarray(codes, dtype=np.int64)
+    count = len(codes)
+
+    # Posição de cada código contada desde o início ou o último CLEAR, e a largura correspondente
+    indexes = np.arange(count)
+    segment_starts = np.zeros(count, dtype=np.int64)
+    if clear_code is not None:
+        clears = np.flatnonzero(codes == clear_code) + 1
+        clears = clears[clears < count]
+        segment_starts[clears] = clears
+        np.maximum.accumulate(segment_starts, out=segment_starts)
+    widths = code_width(0, max_bits, first_code) + np.searchsorted(
+        _growth_positions(max_bits, first_code), indexes - segment_starts, side="right")
+
+    shifts = np.arange(int(widths.max()) - 1, -1, -1)
+    output = bytearray()
+    carry = np.zeros(0, dtype=np.uint8)
+    for start in range(0, count, _NUMPY_CHUNK_CODES):
+        chunk = codes[start:start + _NUMPY_CHUNK_CODES]
+        chunk_widths = widths[start:start + _NUMPY_CHUNK_CODES]
+        bits = ((chunk[:, None] >> shifts) & 1).astype(np.uint8)
+        bits = np.concatenate((carry, bits[shifts < chunk_widths[:, None]]))
+        complete = len(bits) - len(bits) % 8
+        output += np.packbits(bits[:complete]).tobytes()
+        carry = bits[complete:]
+    if len(carry):
+        output += np.packbits(carry).tobytes()  # Completa o último byte com zeros
+    return output
+
+
+def _unpack_codes_numpy(data, max_bits, first_code, clear_code):
+    """Desempacotamento vetorizado de trechos com largura constante, cortando em cada CLEAR."""
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    total_bits = len(buffer) * 8
+    codes = []
+    bit_offset = 0
+    position = 0
+    # Entre dois CLEAR há pelo menos uma tabela inteira de códigos; limitar o trecho a esse
+    # tamanho evita decodificar (e descartar) muitos códigos na largura errada após um CLEAR
+    chunk_codes = _NUMPY_CHUNK_CODES if clear_code is None else min(_NUMPY_CHUNK_CODES, 1 << max_bits)
+
+    while True:
+        width = code_width(position, max_bits, first_code)
+        count = min((total_bits - bit_offset) // width, chunk_codes,
+                    _next_growth(width, max_bits, first_code) - position)
+        if count <= 0:
+            break
+        skip = bit_offset & 7
+        end_byte = (bit_offset + count * width + 7) >> 3
+        bits = np.unpackbits(buffer[bit_offset >> 3:end_byte])[skip:skip + count * width]
+        values = bits.reshape(count, width).dot(1 << np.arange(width - 1, -1, -1, dtype=np.int64))
+
+        position += count
+        if clear_code is not None:
+            clears = np.flatnonzero(values == clear_code)
+            if len(clears):
+                count = int(clears[0]) + 1
+                values = values[:count]
+                position = 0
+        codes.extend(values.tolist())
+        bit_offset += count * width
+
+    del buffer
+    return codes
@@ -0,0 +1,82 @@
+from collections import namedtuple
+from struct import Struct
+
+from .bit_stream import validate_max_bits
+from .dictionary_policy import FREEZE, POLICIES, validate_policy
+
+BLOCK_MAGIC = b"LZB"
+BLOCK_FORMAT_VERSION = 1
+FOOTER_MAGIC = b"LZBI"
+DEFAULT_BLOCK_SIZE = 1 << 20  # 1 MiB de entrada por bloco
+
+_HEADER = Struct(">3sBBBI")  # Assinatura, versão, max_bits, política de tabela cheia, tamanho do bloco
+_ENTRY = Struct(">QII")  # Posição do bloco no arquivo, tamanho comprimido, tamanho original
+_FOOTER = Struct(">QI4s")  # Posição do índice, número de blocos, assinatura final
+HEADER_SIZE = _HEADER.size
+
+BlockHeader = namedtuple("BlockHeader", ["version", "max_bits", "policy", "block_size"])
+BlockEntry = namedtuple("BlockEntry", ["offset", "compressed_size", "raw_size"])
+
+
+def is_block_container(filepath):
+    """Indica se o arquivo é um contêiner de blocos independentes."""
+    with open(filepath, "rb") as file:
+        return file.read(len(BLOCK_MAGIC)) == BLOCK_MAGIC
+
+
+def write_block_container(file, payloads, max_bits, policy=FREEZE, block_size=DEFAULT_BLOCK_SIZE):
+    """Escreve cabeçalho, blocos e a tabela de posições dos blocos no rodapé.
+
+    ``payloads`` produz pares (bloco comprimido, tamanho original) na ordem dos blocos.
+    Retorna a lista de entradas do índice.
+    """
+    file.write(_HEADER.pack(BLOCK_MAGIC, BLOCK_FORMAT_VERSION, max_bits,
+                            POLICIES.index(validate_policy(policy)), block_size))
+    entries = []
+    offset = HEADER_SIZE
+    for payload, raw_size in payloads:
+        file.write(payload)
+        entries.append(BlockEntry(offset, len(payload), raw_size))
+        offset += len(payload)
+
+    file.write(b"".join(_ENTRY.pack(*entry) for entry in entries))
+    file.write(_FOOTER.pack(offset, len(entries), FOOTER_MAGIC))
+    return entries
+
+
+def read_block_header(file):
+    """Lê e valida o cabeçalho do contêiner de blocos a partir do início do arquivo."""
+    file.seek(0)
+    data = file.read(HEADER_SIZE)
+    if len(data) < HEADER_SIZE:
+        raise ValueError("Contêiner de blocos truncado: cabeçalho incompleto.")
+    magic, version, max_bits, policy, block_size = _HEADER.unpack(data)
+    if magic != BLOCK_MAGIC:
+        raise ValueError("Arquivo não é um contêiner de blocos .lzw.")
+    if version != BLOCK_FORMAT_VERSION:
+        raise ValueError(f"Versão de contêiner de blocos não suportada: {version}.")
+    if policy >= len(POLICIES):
+        raise ValueError(f"Política de tabela cheia desconhecida no cabeçalho: {policy}.")
+    try:
+        validate_max_bits(max_bits)
+    except ValueError as exception:
+        raise ValueError(f"Contêiner de blocos corrompido: {exception}") from None
+    return BlockHeader(version, max_bits, POLICIES[policy], block_size)
+
+
+def read_block_index(file):
+    """Lê a tabela de blocos a partir do rodapé, sem percorrer os dados comprimidos."""
+    file.seek(-_FOOTER.size, 2)
+    index_offset, count, magic = _FOOTER.unpack(file.read(_FOOTER.size))
+    if magic != FOOTER_MAGIC:
+        raise ValueError("Contêiner de blocos sem índice válido no rodapé.")
+    file.seek(index_offset)
+    data = file.read(count * _ENTRY.size)
+    return [BlockEntry(*fields) for fields in _ENTRY.iter_unpack(data)]
+
+
+def read_block_payloads(file, entries):
+    """Produz, em ordem, os bytes comprimidos de cada bloco do índice."""
+    for entry in entries:
+        file.seek(entry.offset)
+        yield file.read(entry.compressed_size)
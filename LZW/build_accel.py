@@ -0,0 +1,32 @@
+"""Compila o módulo opcional ``LZW/_lzw_accel.c`` ao lado dos demais módulos do LZW.
+
+Uso: python LZW/build_accel.py
+
+Requer um compilador C, os cabeçalhos do Python e o setuptools (em requirements.txt). Com o módulo compilado, o codificador e
+o decodificador passam a usá-lo automaticamente (backend "native"); sem ele, continuam os
+laços em Python. Para voltar a eles, basta apagar o arquivo ``_lzw_accel*.so`` (ou ``.pyd``).
+"""
+import os
+import sys
+import tempfile
+
+from setuptools import Extension, setup
+
+LZW_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def build(quiet=True):
+    """Compila a extensão e grava o binário em LZW/."""
+    compile_args = [] if sys.platform == "win32" else ["-O3"]
+    extension = Extension("_lzw_accel", [os.path.join(LZW_DIR, "_lzw_accel.c")], extra_compile_args=compile_args)
+    with tempfile.TemporaryDirectory() as build_temp:
+        setup(
+            name="lzw-accel",
+            ext_modules=[extension],
+            script_args=(["--quiet"] if quiet else []) + ["build_ext", "--build-lib", LZW_DIR, "--build-temp", build_temp],
+        )
+
+
+if __name__ == "__main__":
+    build(quiet="--verbose" not in sys.argv)
+    print(f"Módulo _lzw_accel compilado em {LZW_DIR}")
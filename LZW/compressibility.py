@@ -0,0 +1,75 @@
+from .bit_stream import FIRST_CODE, packed_size
+
+SAMPLE_COUNT = 8  # Janelas amostradas, espalhadas uniformemente pela entrada
+SAMPLE_SIZE = 1 << 12  # Bytes de cada janela
+REPETITION_THRESHOLD = 0.75  # Fração de pares de bytes repetidos a partir da qual a entrada é tida como compressível
+
+
+def sample_windows(data, count=SAMPLE_COUNT, size=SAMPLE_SIZE):
+    """Janelas de ``size`` bytes espalhadas uniformemente pela entrada (a entrada inteira, se couber nelas)."""
+    if len(data) <= count * size:
+        return [data]
+    step = (len(data) - size) // (count - 1)
+    return [data[start:start + size] for start in range(0, step * count, step)]
+
+
+def pair_repetition(windows):
+    """Fração dos pares de bytes consecutivos de cada janela que já apareceram antes nela.
+
+    É o que o LZW precisa para formar sequências com mais de um byte: texto fica acima
+    de 90%, enquanto bytes aleatórios ou já comprimidos ficam bem abaixo.
+    """
+    pairs = 0
+    repeated = 0
+    for window in windows:
+        window = bytes(window)
+        pairs += len(window) - 1
+        repeated += len(window) - 1 - len(set(zip(window, window[1:])))
+    return repeated / pairs if pairs > 0 else 0.0
+
+
+def trial_size(sample, max_bits, initial_table=None, first_code=FIRST_CODE):
+    """Tamanho empacotado de uma passada LZW simplificada (tabela congelada ao encher) sobre a amostra.
+
+    ``initial_table`` e ``first_code`` são os do codificador quando ele parte de um
+    dicionário pré-definido (``PresetDictionary.encoder_table``).
+    """
+    table = dict(initial_table) if initial_table else {}
+    max_table_size = 1 << max_bits
+    next_code = first_code
+    codes = []
+    symbols = iter(sample)
+    prefix = next(symbols, None)
+    if prefix is None:
+        return 0
+    for byte in symbols:
+        key = (prefix << 8) | byte
+        code = table.get(key)
+        if code is not None:
+            prefix = code
+        else:
+            codes.append(prefix)
+            if next_code < max_table_size:
+                table[key] = next_code
+                next_code += 1
+            prefix = byte
+    codes.append(prefix)
+    return packed_size(codes, max_bits, first_code)
+
+
+def looks_incompressible(data, max_bits=12, initial_table=None, first_code=FIRST_CODE):
+    """Indica se a entrada parece aleatória ou já comprimida, a ponto de o LZW só aumentar o tamanho.
+
+    Com muitos pares de bytes repetidos nas janelas amostradas, a entrada é tida como
+    compressível sem mais trabalho. Caso contrário, uma passada de teste sobre as janelas
+    concatenadas (no máximo SAMPLE_COUNT * SAMPLE_SIZE bytes, ou a entrada inteira, se for
+    menor) decide: a entrada é descartada se a amostra comprimida não ficar menor que ela.
+    Em entradas grandes com max_bits alto a amostra não chega a encher a tabela, então um
+    ganho pequeno (de poucos por cento) pode deixar de ser aproveitado. Com um dicionário
+    pré-definido, a passada de teste parte da mesma tabela inicial do codificador.
+    """
+    windows = sample_windows(data)
+    if pair_repetition(windows) >= REPETITION_THRESHOLD:
+        return False
+    sample = b"".join(windows)
+    return trial_size(sample, max_bits, initial_table, first_code) >= len(sample)
@@ -0,0 +1,76 @@
+import zlib
+from collections import namedtuple
+from struct import Struct
+
+from .bit_stream import validate_max_bits
+from .dictionary_policy import FREEZE, POLICIES, validate_policy
+
+MAGIC = b"LZW"
+FORMAT_VERSION = 4
+
+# Assinatura, versão do formato, max_bits, política de tabela cheia, ID do dicionário pré-definido (0: nenhum),
+# tamanho e CRC32 do conteúdo original
+_HEADER = Struct(">3sBBBIQI")
+HEADER_SIZE = _HEADER.size
+MAX_ORIGINAL_SIZE = 1 << 48  # 256 TiB: um tamanho original acima disso só pode vir de um cabeçalho corrompido
+
+Header = namedtuple("Header", ["version", "max_bits", "policy", "preset_id", "original_size", "checksum"])
+
+
+def pack_header(max_bits, policy=FREEZE, preset_id=0, original_size=0, checksum=0):
+    """Monta o cabeçalho do contêiner .lzw."""
+    return _HEADER.pack(MAGIC, FORMAT_VERSION, max_bits, POLICIES.index(validate_policy(policy)), preset_id,
+                        original_size, checksum)
+
+
+def unpack_header(data):
+    """Lê e valida o cabeçalho do contêiner .lzw."""
+    if len(data) < HEADER_SIZE:
+        raise ValueError("Arquivo compresso truncado: cabeçalho incompleto.")
+    magic, version, max_bits, policy, preset_id, original_size, checksum = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Arquivo não está no formato .lzw esperado.")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Versão de formato não suportada: {version}.")
+    if policy >= len(POLICIES):
+        raise ValueError(f"Política de tabela cheia desconhecida no cabeçalho: {policy}.")
+    try:
+        validate_max_bits(max_bits, allow_stored=True)
+    except ValueError as exception:
+        raise ValueError(f"Arquivo compresso corrompido: {exception}") from None
+    if original_size > MAX_ORIGINAL_SIZE:
+        raise ValueError(f"Arquivo compresso corrompido: tamanho original implausível no cabeçalho ({original_size}).")
+    return Header(version, max_bits, POLICIES[policy], preset_id, original_size, checksum)
+
+
+def content_checksum(data, checksum=0):
+    """CRC32 do conteúdo original; passando o valor anterior em ``checksum``, acumula bloco a bloco."""
+    return zlib.crc32(data, checksum)
+
+
+def verify_content(header, size, checksum):
+    """Confere o tamanho e o CRC32 do conteúdo descomprimido com os valores gravados no cabeçalho."""
+    if size != header.original_size:
+        raise ValueError(f"Arquivo compresso corrompido: o conteúdo descomprimido tem {size} bytes, "
+                         f"mas o cabeçalho indica {header.original_size}.")
+    if checksum != header.checksum:
+        raise ValueError("Arquivo compresso corrompido: o CRC32 do conteúdo descomprimido não confere com o cabeçalho.")
+
+
+class ContentChecksum:
+    """Acumula o tamanho e o CRC32 de um conteúdo processado em blocos (modo streaming)."""
+
+    def __init__(self):
+        self.size = 0
+        self.checksum = 0
+
+    def update(self, data):
+        """Soma um bloco do conteúdo original."""
+        self.size += len(data)
+        self.checksum = content_checksum(data, self.checksum)
+
+    def track(self, chunks):
+        """Gerador que repassa os blocos, somando cada um deles."""
+        for chunk in chunks:
+            self.update(chunk)
+            yield chunk
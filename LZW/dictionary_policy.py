@@ -0,0 +1,47 @@
+FREEZE = "freeze"  # Congela o dicionário quando a tabela enche (comportamento original)
+RESET = "reset"  # Emite CLEAR e reinicia o dicionário assim que a tabela enche
+ADAPTIVE = "adaptive"  # Com a tabela cheia, reinicia quando a taxa de compressão cai
+
+POLICIES = (FREEZE, RESET, ADAPTIVE)
+
+CLEAR_CODE = 256  # Código reservado que sinaliza o reinício do dicionário
+
+CHECK_INTERVAL = 10000  # Bytes de entrada entre duas verificações da política adaptativa
+ADAPTIVE_THRESHOLD = 0.9  # Fração da melhor taxa abaixo da qual o dicionário é reiniciado
+
+
+def validate_policy(policy):
+    """Garante que a política de tabela cheia é conhecida."""
+    if policy not in POLICIES:
+        raise ValueError(f"Política desconhecida: {policy!r}. Use uma de {POLICIES}.")
+    return policy
+
+
+def first_code_for(policy):
+    """Primeiro código livre do dicionário; as políticas com reinício reservam o CLEAR."""
+    return 256 if policy == FREEZE else CLEAR_CODE + 1
+
+
+def clear_code_for(policy):
+    """Código CLEAR usado pela política, ou None quando o dicionário nunca é reiniciado."""
+    return None if policy == FREEZE else CLEAR_CODE
+
+
+class AdaptiveReset:
+    """Decide quando reiniciar o dicionário cheio, comparando a taxa de cada janela com a melhor já vista."""
+
+    def __init__(self, threshold=ADAPTIVE_THRESHOLD):
+        self.threshold = threshold
+        self.best_ratio = 0.0
+
+    def should_reset(self, bytes_in, codes_out):
+        """Registra uma janela (bytes lidos, códigos emitidos) e indica se o dicionário deve ser reiniciado."""
+        ratio = bytes_in / max(codes_out, 1)
+        if ratio > self.best_ratio:
+            self.best_ratio = ratio
+            return False
+        return ratio < self.best_ratio * self.threshold
+
+    def reset(self):
+        """Esquece a melhor taxa após um reinício do dicionário."""
+        self.best_ratio = 0.0
@@ -1,45 +1,413 @@
+import os
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+
+from .bit_stream import STORED_MAX_BITS, unpack_codes, validate_max_bits
+from .block_container import read_block_header, read_block_index
+from .dictionary_policy import FREEZE, clear_code_for, first_code_for, validate_policy
+from .parallel import ordered_map
+from .preset_dictionary import preset_size
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: sem ele o backend "numpy" fica indisponível
+    np = None
+
+try:
+    from . import _lzw_accel
+except ImportError:  # Módulo compilado opcional (python LZW/build_accel.py): sem ele, o laço é em Python
+    _lzw_accel = None
+
+BACKENDS = ("dict", "array", "numpy", "native")
+DEFAULT_BACKEND = "native" if _lzw_accel is not None else "dict"  # O laço compilado, quando disponível
+PREALLOCATION_LIMIT = 1 << 26  # Maior saída pré-alocada a partir do tamanho do cabeçalho (64 MiB, como no módulo compilado)
+
+_LITERALS = tuple(bytes((i,)) for i in range(256))  # Sequência de cada código literal, criada uma única vez
+
+
+def initial_entries(max_bits, policy=FREEZE, preset=None):
+    """Dicionário inicial como lista indexada pelo código: bytes, CLEAR (sem sequência) e entradas pré-definidas.
+
+    As entradas novas são acrescentadas ao fim da lista, então voltar ao dicionário inicial
+    (após um CLEAR) é só truncá-la no primeiro código livre.
+    """
+    entries = list(_LITERALS)
+    entries.extend([None] * (first_code_for(policy) - len(entries)))
+    if preset is not None:
+        entries.extend(preset.entries[:preset_size(preset, max_bits, policy)])
+    return entries
+
+
 class LZWDecoder:
     """Classe para descompressão de dados codificados com o algoritmo LZW usando expansão dinâmica do dicionário."""
 
-    def __init__(self, max_bits=12):
-        self.max_bits = max_bits
-        self.dictionary = {}
+    def __init__(self, max_bits=12, policy=FREEZE, backend=DEFAULT_BACKEND, stats=None, preset=None):
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend desconhecido: {backend!r}. Use um de {BACKENDS}.")
+        if backend == "numpy" and np is None:
+            raise ValueError("O backend \"numpy\" requer o NumPy instalado.")
+        if backend == "native" and _lzw_accel is None:
+            raise ValueError("O backend \"native\" requer o módulo compilado (python LZW/build_accel.py).")
+        self.max_bits = validate_max_bits(max_bits, allow_stored=True)  # STORED_MAX_BITS: conteúdo armazenado
+        self.policy = validate_policy(policy)
+        self.preset = preset  # PresetDictionary opcional; deve ser o mesmo usado na compressão
+        self.first_code = first_code_for(policy) + preset_size(preset, max_bits, policy)
+        if backend not in ("dict", "native") and self.first_code != first_code_for(policy):
+            raise ValueError("O dicionário pré-definido só é suportado pelos backends \"dict\" e \"native\".")
+        self.backend = backend
+        self.stats = stats  # CodecStats opcional, preenchido a cada descompressão
+        self._initial_entries = initial_entries(max_bits, policy, preset)
+        self._longest_entry = max((len(entry) for entry in self._initial_entries if entry is not None), default=1)
+        self.dictionary = []
+        self._block_indexes = {}  # Cache dos índices de blocos já lidos, por arquivo
 
     def _initialize_dictionary(self):
-        """Inicializa o dicionário com as entradas ASCII."""
-        self.dictionary = {i: chr(i) for i in range(256)}
-        self.next_code = 256
+        """Inicializa o dicionário (lista indexada pelo código) a partir da lista inicial já montada."""
+        self.dictionary = self._initial_entries.copy()
+
+    def decompress(self, codes, size=None):
+        """Descompressão dos dados a partir de uma lista de códigos.
+
+        Os backends "dict", "numpy" e "native" retornam bytes; o backend "array" retorna um bytearray.
+        ``size`` é o tamanho original, quando conhecido (por exemplo, do cabeçalho): o backend
+        "array" pré-aloca a saída com ele (até PREALLOCATION_LIMIT) e dispensa a passada que calcula o tamanho.
+        """
+        stats = self.stats
+        if stats is not None:
+            stats.start_pass()
+            stats.count_widths(codes, self.max_bits, self.first_code, clear_code_for(self.policy))
+
+        if self.max_bits == STORED_MAX_BITS:
+            # Conteúdo armazenado sem compressão: os códigos já são os bytes originais
+            return bytearray(codes) if self.backend == "array" else bytes(codes)
+        if self.backend == "array":
+            return self._decompress_array(codes, size)
+        if self.backend == "numpy":
+            return self._decompress_numpy(codes)
+        if self.backend == "native":
+            return self._decompress_native(codes, size)
 
-    def decompress(self, codes):
-        """Descompressão dos dados a partir de uma lista de códigos."""
         if not codes:
-            return ""
+            return b""
 
         self._initialize_dictionary()
+        dictionary = self.dictionary
+        first_code = self.first_code
         max_table_size = 1 << self.max_bits
+        clear_code = clear_code_for(self.policy)
 
-        # Verifica se o primeiro código está no dicionário, caso contrário, inicializa-o
         output = []
-        prev_code = codes[0]
-        if prev_code not in self.dictionary:
-            self.dictionary[prev_code] = chr(prev_code % 256)  # Adiciona uma entrada padrão
-        output.append(self.dictionary[prev_code])
-
-        for code in codes[1:]:
-            if code in self.dictionary:
-                entry = self.dictionary[code]
+        previous = None  # Última sequência emitida
+        clears = 0
+        misses = 0
+        for code in codes:
+            if code == clear_code:
+                # O codificador reiniciou o dicionário: descarta as entradas criadas desde o início
+                del dictionary[first_code:]
+                previous = None
+                clears += 1
+                continue
+
+            if code < len(dictionary):
+                entry = dictionary[code]
+            elif previous is None:
+                entry = bytes((code % 256,))  # Entrada padrão para um primeiro código desconhecido
             else:
                 # Tratamento para casos em que o código ainda não está no dicionário
-                entry = self.dictionary[prev_code] + self.dictionary[prev_code][0]
+                entry = previous + previous[:1]
+                misses += 1
 
             output.append(entry)
 
             # Adiciona uma nova sequência ao dicionário, se houver espaço
-            if self.next_code < max_table_size:
-                new_entry = self.dictionary[prev_code] + entry[0]
-                self.dictionary[self.next_code] = new_entry
-                self.next_code += 1
+            if previous is not None and len(dictionary) < max_table_size:
+                dictionary.append(previous + entry[:1])
+                if stats is not None and len(dictionary) == max_table_size:
+                    stats.record_fill(len(output))
+
+            previous = entry
+
+        if stats is not None:
+            stats.lookups = len(codes) - clears
+            stats.misses = misses
+        return b"".join(output)
+
+    def _max_output_size(self, count):
+        """Maior saída que ``count`` códigos podem produzir, para limitar o tamanho vindo do cabeçalho.
+
+        Cada entrada nova tem no máximo um byte a mais que uma entrada já existente, então
+        nenhuma sequência passa da maior entrada inicial somada ao número de entradas criadas.
+        """
+        created = max(min(count, (1 << self.max_bits) - self.first_code), 0)
+        return count * (self._longest_entry + created + 1)
+
+    def _decompress_native(self, codes, size=None):
+        """Mesmo laço do backend "dict", executado pelo módulo compilado; ``size`` só pré-aloca a saída."""
+        clear_code = clear_code_for(self.policy)
+        size_hint = min(size or 0, self._max_output_size(len(codes)))  # O cabeçalho pode estar corrompido
+        data, clears, misses, fill = _lzw_accel.decode(codes, self.max_bits, -1 if clear_code is None else clear_code,
+                                                       self._initial_entries, size_hint)
+        stats = self.stats
+        if stats is not None:
+            if fill >= 0:
+                stats.record_fill(fill)
+            stats.lookups = len(codes) - clears
+            stats.misses = misses
+        return data
+
+    def _decompress_array(self, codes, size=None):
+        """Descompressão com dicionário compacto em arrays, escrevendo direto em um bytearray pré-alocado.
+
+        Cada entrada nova é a sequência anterior seguida de um byte, e esses bytes já estão
+        na saída logo na posição em que a sequência anterior foi escrita. Por isso a entrada
+        é guardada apenas como (posição na saída, comprimento) em dois arrays, o que equivale
+        a (prefixo, último byte, comprimento), e é expandida com uma única cópia de fatia.
+        Sem ``size``, ou com um ``size`` acima de PREALLOCATION_LIMIT (o cabeçalho pode estar
+        corrompido), uma primeira passada calcula os comprimentos para pré-alocar a saída exata.
+        """
+        first_code = first_code_for(self.policy)
+        clear_code = clear_code_for(self.policy)
+        max_table_size = 1 << self.max_bits
+
+        lengths = array('L', [1]) * first_code
+        total = size
+        if total is not None and total > self._max_output_size(len(codes)):
+            # Evita pré-alocar a partir de um tamanho corrompido no cabeçalho
+            raise ValueError(f"Os códigos não produzem {total} bytes: são apenas {len(codes)} códigos.")
+        if total is not None and total > PREALLOCATION_LIMIT:
+            total = None  # Não confia um bytearray desse tamanho ao cabeçalho; o tamanho é conferido depois
+        if total is None:
+            # 1ª passada: comprimento de cada entrada e tamanho total da saída
+            total = 0
+            prev_length = 0
+            for code in codes:
+                if code == clear_code:
+                    del lengths[first_code:]
+                    prev_length = 0
+                    continue
+                if code < len(lengths):
+                    length = lengths[code]
+                else:
+                    length = prev_length + 1 if prev_length else 1
+                if prev_length and len(lengths) < max_table_size:
+                    lengths.append(prev_length + 1)
+                total += length
+                prev_length = length
+            del lengths[first_code:]
+
+        # Copia cada sequência de onde ela já foi escrita na saída
+        output = bytearray(total)
+        view = memoryview(output)
+        offsets = array('Q', [0]) * first_code
+        position = 0
+        prev_position = 0
+        prev_length = 0
+        try:
+            for code in codes:
+                if code == clear_code:
+                    del lengths[first_code:]
+                    del offsets[first_code:]
+                    prev_length = 0
+                    continue
+                if code < 256:
+                    length = 1
+                    output[position] = code
+                elif code < len(lengths):
+                    length = lengths[code]
+                    offset = offsets[code]
+                    view[position:position + length] = view[offset:offset + length]
+                elif prev_length:
+                    # Código ainda não está no dicionário (caso cScSc): anterior + seu primeiro byte
+                    length = prev_length + 1
+                    view[position:position + prev_length] = view[prev_position:prev_position + prev_length]
+                    output[position + prev_length] = output[prev_position]
+                else:
+                    length = 1
+                    output[position] = code % 256  # Entrada padrão, como no backend "dict"
+                if prev_length and len(lengths) < max_table_size:
+                    lengths.append(prev_length + 1)
+                    offsets.append(prev_position)
+                prev_position = position
+                prev_length = length
+                position += length
+        except (IndexError, ValueError):
+            # Só acontece com ``size`` informado: os códigos produzem mais bytes que o esperado
+            raise ValueError(f"Os códigos produzem mais de {total} bytes.") from None
+        finally:
+            view.release()
+        if position != total:
+            raise ValueError(f"Os códigos produzem {position} bytes, mas eram esperados {total}.")
+        return output
+
+    def _decompress_numpy(self, codes):
+        """Descompressão vetorizada: reconstrói o dicionário e expande os códigos em lotes com NumPy.
+
+        A entrada definida na posição ``j`` é a sequência emitida em ``j - 1`` seguida do
+        primeiro byte da emitida em ``j``. Assim, cada código não literal aponta para a posição
+        do seu prefixo, e comprimento e primeiro byte de todas as posições saem por saltos
+        de ponteiro (log do maior comprimento passos vetorizados). Com os comprimentos, a
+        soma acumulada dá onde cada sequência termina na saída, e as sequências são escritas
+        de trás para frente, um byte de todas as sequências ativas por passo, seguindo os
+        ponteiros de prefixo. Fluxos malformados são entregues ao backend "array".
+        """
+        first_code = first_code_for(self.policy)
+        clear_code = clear_code_for(self.policy)
+        max_table_size = 1 << self.max_bits
+
+        if isinstance(codes, (bytes, bytearray, memoryview)):
+            codes = np.frombuffer(codes, dtype=np.uint8)  # Bytes crus (max_bits 8)
+        codes = np.asarray(codes, dtype=np.intp)
+        positions = np.arange(len(codes))
+        if clear_code is not None:
+            # Remove os CLEAR, guardando onde começa o segmento (dicionário novo) de cada código
+            clears = codes == clear_code
+            segments = np.cumsum(clears)[~clears]
+            codes = codes[~clears]
+            positions = positions[:len(codes)]
+            segment_starts = np.searchsorted(segments, segments)
+        else:
+            segment_starts = np.zeros(len(codes), dtype=np.intp)
+        if not len(codes):
+            return b""
+
+        # Posição do prefixo de cada código (-1 para os literais)
+        literal = codes < 256
+        prefixes = np.where(literal, -1, segment_starts + (codes - first_code))
+        if np.any(~literal & ((codes < first_code) | (codes >= max_table_size) | (prefixes >= positions))):
+            return bytes(self._decompress_array(codes.tolist()))
+
+        # Saltos de ponteiro até o literal de origem: distância (comprimento - 1) e raiz.
+        # Só as posições que ainda não chegaram a um literal participam de cada passo
+        distances = (~literal).astype(np.intp)
+        roots = np.where(literal, positions, prefixes)
+        pending = np.flatnonzero(~literal)
+        while len(pending):
+            jumps = roots[pending]
+            distances[pending] += distances[jumps]
+            roots[pending] = roots[jumps]
+            pending = pending[~literal[roots[pending]]]
+        lengths = distances + 1
+        first_bytes = codes[roots]
+        # Último byte de cada sequência: o próprio literal ou o primeiro byte da posição seguinte ao prefixo
+        last_bytes = np.where(literal, codes, first_bytes[prefixes + 1]).astype(np.uint8)
+
+        targets = np.cumsum(lengths) - 1
+        output = np.empty(int(targets[-1]) + 1, dtype=np.uint8)
+        # A cada passo escreve um byte (de trás para frente) de cada sequência ainda ativa e
+        # segue para o prefixo; as sequências que chegaram ao literal de origem saem do lote
+        active = positions
+        while len(active):
+            output[targets] = last_bytes[active]
+            pending = ~literal[active]
+            active = prefixes[active[pending]]
+            targets = targets[pending] - 1
+        return output.tobytes()
+
+    def decompress_blocks(self, payloads, workers=None):
+        """Descomprime blocos independentes em um pool de processos, produzindo os bytes em ordem."""
+        jobs = ((payload, self.max_bits, self.policy) for payload in payloads)
+        return ordered_map(_decompress_block, jobs, workers)
+
+    def read_range(self, path, offset, length):
+        """Retorna ``length`` bytes do conteúdo original a partir de ``offset``, descomprimindo só os blocos necessários.
+
+        Os blocos são localizados pela tabela no rodapé do contêiner de blocos; o max_bits e a
+        política vêm do cabeçalho do arquivo. O índice fica em cache enquanto o arquivo não muda.
+        """
+        if offset < 0 or length < 0:
+            raise ValueError(f"Intervalo inválido: offset ({offset}) e length ({length}) não podem ser negativos.")
+        with open(path, "rb") as file:
+            header, entries, starts = self._load_block_index(path, file)
+            end = min(offset + length, starts[-1])
+            if offset >= end:
+                return b""
+
+            first = bisect_right(starts, offset) - 1
+            last = bisect_right(starts, end - 1) - 1
+            pieces = []
+            for entry in entries[first:last + 1]:
+                file.seek(entry.offset)
+                pieces.append(_decompress_block((file.read(entry.compressed_size), header.max_bits, header.policy)))
+
+        data = b"".join(pieces)
+        base = starts[first]
+        return data[offset - base:end - base]
+
+    def _load_block_index(self, path, file):
+        """Lê (ou recupera do cache) o cabeçalho, o índice e a posição original de início de cada bloco."""
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        cached = self._block_indexes.get(key)
+        if cached is None:
+            header = read_block_header(file)
+            entries = read_block_index(file)
+            starts = list(accumulate((entry.raw_size for entry in entries), initial=0))
+            cached = self._block_indexes[key] = (header, entries, starts)
+        return cached
+
+    def decompressobj(self):
+        """Cria um objeto de descompressão incremental com o max_bits e a política atuais."""
+        return LZWDecompressor(self.max_bits, self.policy, self.preset)
+
+
+def _decompress_block(job):
+    """Descomprime um bloco isolado; executada nos processos do pool de ``decompress_blocks``."""
+    payload, max_bits, policy = job
+    codes = unpack_codes(payload, max_bits, first_code_for(policy), clear_code_for(policy))
+    if _lzw_accel is not None:
+        return LZWDecoder(max_bits, policy, backend="native").decompress(codes)
+    return LZWDecompressor(max_bits, policy).feed(codes)
+
+
+class LZWDecompressor:
+    """Descompressão incremental de códigos LZW em bytes (semelhante a ``zlib.decompressobj``).
+
+    O dicionário é limitado por max_bits, então a memória usada não depende do
+    tamanho total do fluxo.
+    """
+
+    def __init__(self, max_bits=12, policy=FREEZE, preset=None):
+        self.max_bits = validate_max_bits(max_bits, allow_stored=True)
+        self.policy = validate_policy(policy)
+        self.max_table_size = 1 << max_bits
+        self.first_code = first_code_for(policy) + preset_size(preset, max_bits, policy)
+        self.clear_code = clear_code_for(policy)
+        self.dictionary = initial_entries(max_bits, policy, preset)  # Truncado no primeiro código livre a cada CLEAR
+        self.previous = None  # Última sequência emitida
+
+    def feed(self, codes):
+        """Processa uma lista de códigos e retorna os bytes correspondentes."""
+        dictionary = self.dictionary
+        max_table_size = self.max_table_size
+        first_code = self.first_code
+        clear_code = self.clear_code
+        previous = self.previous
+        output = []
+
+        for code in codes:
+            if code == clear_code:
+                # O codificador reiniciou o dicionário; o próximo código é tratado como o primeiro
+                del dictionary[first_code:]
+                previous = None
+                continue
+
+            if code < len(dictionary):
+                entry = dictionary[code]
+            elif previous is None:
+                entry = bytes((code % 256,))  # Entrada padrão, como em LZWDecoder.decompress
+            else:
+                # Código ainda não está no dicionário (caso cScSc)
+                entry = previous + previous[:1]
+            if previous is not None and len(dictionary) < max_table_size:
+                dictionary.append(previous + entry[:1])
+            output.append(entry)
+            previous = entry
 
-            prev_code = code
+        self.previous = previous
+        return b"".join(output)
 
-        return "".join(output)
+    def flush(self):
+        """Finaliza o fluxo; todo o conteúdo já foi entregue por ``feed``."""
+        self.previous = None
+        return b""
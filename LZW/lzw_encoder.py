@@ -1,72 +1,433 @@
+from .bit_stream import STORED_MAX_BITS, pack_codes, packed_size, validate_max_bits
+from .compressibility import looks_incompressible
+from .dictionary_policy import (
+    ADAPTIVE,
+    CHECK_INTERVAL,
+    CLEAR_CODE,
+    FREEZE,
+    RESET,
+    AdaptiveReset,
+    clear_code_for,
+    first_code_for,
+    validate_policy,
+)
+from .parallel import ordered_map
+from .preset_dictionary import preset_size
 from .trie import Trie
 
+try:
+    from . import _lzw_accel
+except ImportError:  # Módulo compilado opcional (python LZW/build_accel.py): sem ele, o laço é em Python
+    _lzw_accel = None
+
+BACKENDS = ("trie", "dict", "native")
+DEFAULT_BACKEND = "native" if _lzw_accel is not None else "dict"  # O laço compilado, quando disponível
+
+AUTO_SAMPLE_SIZE = 1 << 16  # Bytes do prefixo usados para escolher o max_bits no modo automático
+
+_BINARY_WORDS = [format(i, '08b') for i in range(256)]  # Palavra binária de 8 bits de cada byte
+
+
 class LZWEncoder:
     """Classe para compressão de dados usando o algoritmo LZW com Trie compacta e formato binário variável."""
 
-    def __init__(self, max_bits=12):
-        self.max_bits = max_bits
+    def __init__(self, max_bits=12, backend=DEFAULT_BACKEND, policy=FREEZE, auto_width=False, stats=None, preset=None,
+                 verbose=False):
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend desconhecido: {backend!r}. Use um de {BACKENDS}.")
+        if backend == "native" and _lzw_accel is None:
+            raise ValueError("O backend \"native\" requer o módulo compilado (python LZW/build_accel.py).")
+        self.max_bits = validate_max_bits(max_bits)
         self.initial_max_bits = max_bits
+        self.backend = backend
+        self.policy = validate_policy(policy)
+        self.preset = preset  # PresetDictionary opcional, carregado antes do primeiro byte
+        self.auto_width = auto_width  # Se True, max_bits é o limite superior da escolha automática
+        self.stats = stats  # CodecStats opcional, preenchido a cada passada de compressão
+        self.verbose = verbose  # Exibe um aviso quando a entrada é armazenada sem compressão (linha de comando)
         self.trie = Trie()
+        self._trie_key = None  # (primeiro código do dicionário pré-definido, entradas) da Trie guardada
+        self.table = {}
+
+    @property
+    def first_code(self):
+        """Primeiro código livre: após os bytes, o CLEAR e as entradas do dicionário pré-definido."""
+        return first_code_for(self.policy) + preset_size(self.preset, self.max_bits, self.policy)
 
     def _initialize_dictionary(self):
-        """Inicializa o dicionário com as palavras ASCII em formato binário."""
-        self.trie = Trie()
-        for i in range(256):
-            binary_value = format(i, '08b')
-            self.trie.insert(binary_value, i)
-        self.next_code = 256  # Primeiro código livre após os caracteres ASCII
+        """Inicializa o dicionário com as palavras ASCII em formato binário e o dicionário pré-definido.
+
+        A Trie inicial é montada uma única vez e guardada com ``Trie.snapshot``; as
+        inicializações seguintes (novas passadas e reinícios) só desfazem as inserções.
+        """
+        key = (first_code_for(self.policy), preset_size(self.preset, self.max_bits, self.policy))
+        if key == self._trie_key:
+            self.trie.restore()
+        else:
+            self.trie = Trie()
+            for i, binary_value in enumerate(_BINARY_WORDS):
+                self.trie.insert(binary_value, i)
+            if self.preset is not None:
+                for code, entry in enumerate(self.preset.entries[:key[1]], key[0]):
+                    self.trie.insert("".join([_BINARY_WORDS[byte] for byte in entry]), code)
+            self.trie.snapshot()
+            self._trie_key = key
+            # Cursores das 256 palavras iniciais, para recomeçar uma sequência sem partir da raiz;
+            # continuam válidos após cada restore, pois os nós são os mesmos
+            root = self.trie.cursor()
+            self.symbol_cursors = {binary_value: root.step(binary_value) for binary_value in _BINARY_WORDS}
+        self.next_code = self.first_code  # Primeiro código livre após os caracteres ASCII (e o CLEAR)
+
+    def compressobj(self):
+        """Cria um objeto de compressão incremental com o max_bits e a política atuais."""
+        return LZWCompressor(self.max_bits, self.policy, self.stats, self.preset,
+                             "native" if self.backend == "native" else "dict")
+
+    def compress_blocks(self, blocks, workers=None):
+        """Comprime blocos independentes em um pool de processos, cada um com um dicionário novo.
+
+        Produz, na ordem de entrada, pares (códigos empacotados, tamanho original) com o
+        max_bits e a política atuais, sem o ajuste automático de largura.
+        """
+        jobs = ((block, self.max_bits, self.policy) for block in blocks)
+        return ordered_map(_compress_block, jobs, workers)
 
     def compress(self, data):
-        """Compressão de dados com ajuste dinâmico de max_bits para garantir a eficiência."""
-        original_size = len(data)
+        """Compressão de bytes com ajuste dinâmico de max_bits para garantir a eficiência.
+
+        Retorna a lista de códigos ou, se a compressão não reduz o tamanho, os próprios bytes
+        de entrada (com max_bits igual a STORED_MAX_BITS, cada byte é um código literal).
+        Entradas que a amostragem de ``looks_incompressible`` (com o dicionário pré-definido,
+        se houver) indica como aleatórias ou já comprimidas são armazenadas assim sem passar
+        pelo codificador.
+        """
+        # Trabalha diretamente sobre os bytes, sem cópias intermediárias
+        symbols = memoryview(data).cast('B')
+        original_size = len(symbols)
+        clear_code = clear_code_for(self.policy)
 
-        # Converte cada símbolo para uma string binária de 8 bits
-        binary_words = [''.join(format(ord(str(char)[0]), '08b')) if len(str(char)) == 1 else '' for char in data]
+        preset_entries = preset_size(self.preset, self.initial_max_bits, self.policy)
+        initial_table = self.preset.encoder_table(first_code_for(self.policy), preset_entries) if preset_entries else None
+        if looks_incompressible(symbols, self.initial_max_bits, initial_table,
+                                first_code_for(self.policy) + preset_entries):
+            if self.verbose:
+                print("Entrada incompressível (aleatória ou já comprimida). Armazenando o original.")
+            return self._store(data, original_size)
 
-        compressed_data = self._compress_with_max_bits(binary_words)
-        compressed_size = len(compressed_data) * (self.max_bits // 8)
+        if self.backend != "trie":
+            compress_with_max_bits = self._compress_bytes_with_max_bits
+        else:
+            # Converte cada byte para uma palavra binária de 8 bits
+            symbols = [_BINARY_WORDS[byte] for byte in symbols]
+            compress_with_max_bits = self._compress_with_max_bits
 
-        # Ajusta max_bits apenas se necessário
-        while compressed_size >= original_size and self.max_bits > 8:
-            self.max_bits -= 1
-            compressed_data = self._compress_with_max_bits(binary_words)
-            compressed_size = len(compressed_data) * (self.max_bits // 8)
+        self.max_bits = self.initial_max_bits
+        if self.auto_width:
+            compressed_data = self._compress_auto_width(symbols, compress_with_max_bits)
+            compressed_size = packed_size(compressed_data, self.max_bits, self.first_code, clear_code)
+        else:
+            compressed_data = compress_with_max_bits(symbols)
+            compressed_size = packed_size(compressed_data, self.max_bits, self.first_code, clear_code)
+
+            # Ajusta max_bits apenas se necessário; abaixo de 9 bits só resta armazenar o original
+            while compressed_size >= original_size and self.max_bits > STORED_MAX_BITS + 1:
+                self.max_bits -= 1
+                compressed_data = compress_with_max_bits(symbols)
+                compressed_size = packed_size(compressed_data, self.max_bits, self.first_code, clear_code)
 
         # Se a compressão não reduz o tamanho, retorna o original
         if compressed_size >= original_size:
-            print("Compressão aumentou o tamanho do arquivo. Retornando o original.")
-            return data
-        
-        compressed_data = [int(ord(code)) if isinstance(code, str) and code.isdigit() else code for code in compressed_data]
+            if self.verbose:
+                print("Compressão aumentou o tamanho do arquivo. Retornando o original.")
+            return self._store(data, original_size)
+
+        if self.stats is not None:
+            self.stats.count_widths(compressed_data, self.max_bits, self.first_code, clear_code)
 
         return compressed_data
 
+    def _store(self, data, original_size):
+        """Marca a saída como armazenada (max_bits igual a STORED_MAX_BITS) e retorna os bytes originais."""
+        self.max_bits = STORED_MAX_BITS  # Com 8 bits cada código é um byte literal
+        if self.stats is not None:
+            self.stats.codes_per_width = {STORED_MAX_BITS: original_size} if original_size else {}
+        return data
+
+    def _compress_auto_width(self, symbols, compress_with_max_bits):
+        """Escolhe max_bits avaliando apenas uma amostra e depois comprime a entrada uma única vez.
+
+        As larguras candidatas (de 9 bits até o max_bits configurado) são comparadas pelo
+        tamanho empacotado real sobre os primeiros AUTO_SAMPLE_SIZE símbolos; em caso de
+        empate vence a maior largura. Uma largura cuja tabela não chega a encher na amostra
+        produz os mesmos códigos que a largura máxima e nem é avaliada. Se a entrada cabe
+        na amostra, os códigos da melhor candidata já são o resultado final; a passada só é
+        refeita quando a última largura avaliada não é a escolhida, para que a tabela, o
+        próximo código e os contadores de ``stats`` correspondam à largura escolhida.
+        """
+        clear_code = clear_code_for(self.policy)
+        sample = symbols[:AUTO_SAMPLE_SIZE]
+
+        codes = compress_with_max_bits(sample)
+        best_size = packed_size(codes, self.max_bits, self.first_code, clear_code)
+        best_bits, best_codes = self.max_bits, codes
+        table_filled = clear_code in codes or self.next_code >= 1 << self.max_bits
+        used_entries = self.next_code
+
+        for bits in range(self.initial_max_bits - 1, 8, -1):
+            if not table_filled and 1 << bits >= used_entries:
+                continue  # Tabela não enche nesta largura: mesmos códigos da largura máxima
+            self.max_bits = bits
+            codes = compress_with_max_bits(sample)
+            size = packed_size(codes, bits, self.first_code, clear_code)
+            if size < best_size:
+                best_size, best_bits, best_codes = size, bits, codes
+
+        evaluated_bits = self.max_bits  # Largura da última passada, cujo estado ficou no codificador
+        self.max_bits = best_bits
+        if len(sample) < len(symbols) or evaluated_bits != best_bits:
+            best_codes = compress_with_max_bits(symbols)
+        return best_codes
+
     def _compress_with_max_bits(self, binary_words):
         """Compressão de palavras binárias com base em max_bits atual."""
         self._initialize_dictionary()
+        stats = self.stats
+        if stats is not None:
+            stats.start_pass()
         max_table_size = 1 << self.max_bits
-        current_string = ""
+        can_reset = self.policy != FREEZE and max_table_size > self.first_code
+        adaptive = can_reset and self.policy == ADAPTIVE
+        monitor = AdaptiveReset()
+        window_bytes = 0
+        window_start = 0
+        cursor = None  # Posição da sequência corrente na Trie (None: nenhuma sequência pendente)
         codes = []
+        misses = 0
+        restarts = 0  # Reinícios da política adaptativa, após os quais o símbolo seguinte só inicia a sequência
+        nodes_visited = 0  # Nós visitados nas Tries já descartadas por um reinício
 
         for binary_word in binary_words:
-            combined_string = current_string + binary_word
-            if self.trie.search(combined_string) is not None:
-                current_string = combined_string
+            # Estende a sequência corrente com um passo do cursor, sem refazer a busca desde a raiz
+            next_cursor = cursor.step(binary_word) if cursor is not None else None
+            if next_cursor is not None and next_cursor.code is not None:
+                cursor = next_cursor
             else:
-                if current_string:
-                    code = self.trie.search(current_string)
-                    if code is not None:
-                        codes.append(code)
+                if cursor is not None:
+                    misses += 1
+                    codes.append(cursor.code)
+
+                    if self.next_code < max_table_size:
+                        cursor.add_child(binary_word, self.next_code)
+                        self.next_code += 1
+                        if stats is not None and self.next_code == max_table_size:
+                            stats.record_fill(len(codes))
+                    elif can_reset and self.policy == RESET:
+                        # Tabela cheia: sinaliza o reinício e recomeça com o dicionário inicial
+                        codes.append(CLEAR_CODE)
+                        nodes_visited += self.trie.nodes_visited
+                        self._initialize_dictionary()
 
-                if self.next_code < max_table_size:
-                    self.trie.insert(combined_string, self.next_code)
-                    self.next_code += 1
+                cursor = self.symbol_cursors[binary_word]
 
-                current_string = binary_word
+            if adaptive:
+                window_bytes += 1
+                if window_bytes == CHECK_INTERVAL:
+                    if self.next_code >= max_table_size and monitor.should_reset(window_bytes, len(codes) - window_start):
+                        # A taxa caiu com a tabela cheia: emite a sequência pendente e reinicia
+                        codes.append(cursor.code)
+                        codes.append(CLEAR_CODE)
+                        nodes_visited += self.trie.nodes_visited
+                        self._initialize_dictionary()
+                        monitor.reset()
+                        cursor = None
+                        restarts += 1
+                    window_bytes = 0
+                    window_start = len(codes)
+
+        if cursor is not None:
+            codes.append(cursor.code)
+
+        if stats is not None:
+            # Um passo do cursor por símbolo, exceto os que apenas iniciam uma sequência (como nos backends "dict"
+            # e "native")
+            stats.lookups = max(len(binary_words) - 1 - restarts, 0)
+            stats.misses = misses
+            stats.trie_nodes_visited = nodes_visited + self.trie.nodes_visited
+        return codes
 
-        if current_string:
-            code = self.trie.search(current_string)
+    def _compress_bytes_with_max_bits(self, data):
+        """Compressão direta de bytes: uma consulta na tabela por byte de entrada.
+
+        Os códigos gerados são idênticos aos de ``_compress_with_max_bits`` para o mesmo max_bits.
+        """
+        if self.stats is not None:
+            self.stats.start_pass()
+        compressor = self.compressobj()
+        codes = compressor.feed(data)
+        codes.extend(compressor.flush())
+        self.table = compressor.table
+        self.next_code = compressor.next_code
+        return codes
+
+
+def _compress_block(job):
+    """Comprime um bloco isolado; executada nos processos do pool de ``compress_blocks``."""
+    block, max_bits, policy = job
+    compressor = LZWCompressor(max_bits, policy)
+    codes = compressor.feed(block)
+    codes.extend(compressor.flush())
+    return pack_codes(codes, max_bits, compressor.first_code, clear_code_for(policy)), len(block)
+
+
+class LZWCompressor:
+    """Compressão incremental de bytes (semelhante a ``zlib.compressobj``).
+
+    Cada entrada da tabela é indexada pelo par (código do prefixo, próximo byte),
+    empacotado no inteiro ``(prefixo << 8) | byte``; os 256 bytes são implícitos
+    (código == byte). A memória usada é limitada por max_bits, independentemente
+    do tamanho total da entrada. Com um dicionário pré-definido, a tabela começa (e
+    recomeça após cada CLEAR) com as entradas dele. Com o backend "native", a tabela e o
+    laço ficam no módulo compilado ``_lzw_accel``, que gera os mesmos códigos.
+    """
+
+    def __init__(self, max_bits=12, policy=FREEZE, stats=None, preset=None, backend=DEFAULT_BACKEND):
+        if backend not in ("dict", "native"):
+            raise ValueError(f"Backend desconhecido: {backend!r}. Use \"dict\" ou \"native\".")
+        if backend == "native" and _lzw_accel is None:
+            raise ValueError("O backend \"native\" requer o módulo compilado (python LZW/build_accel.py).")
+        self.max_bits = validate_max_bits(max_bits)
+        self.policy = validate_policy(policy)
+        self.stats = stats  # CodecStats opcional; os contadores são somados uma vez por bloco
+        self.max_table_size = 1 << max_bits
+        size = preset_size(preset, max_bits, policy)
+        self.first_code = first_code_for(policy) + size
+        can_reset = policy != FREEZE and self.max_table_size > self.first_code
+        self.reset_when_full = can_reset and policy == RESET
+        self.adaptive = can_reset and policy == ADAPTIVE
+        self._initial_table = preset.encoder_table(first_code_for(policy), size) if size else {}
+        self._native = None
+        if backend == "native":
+            self._native = _lzw_accel.Encoder(max_bits, self.first_code, self._initial_table, self.reset_when_full)
+            self.table = None  # A tabela fica no módulo compilado
+        else:
+            self.table = dict(self._initial_table)
+        self.next_code = self.first_code  # Primeiro código livre após os caracteres ASCII (e o CLEAR)
+        self.prefix = None  # Código da sequência corrente ainda não emitida
+        self.codes_out = 0  # Códigos emitidos até agora
+        self._monitor = AdaptiveReset()
+        self._window_remaining = CHECK_INTERVAL
+        self._window_codes = 0
+
+    def feed(self, chunk):
+        """Processa um bloco de bytes e retorna a lista de códigos já definidos."""
+        data = memoryview(chunk).cast('B')
+        if not self.adaptive:
+            return self._encode(data)
+
+        # Na política adaptativa a entrada é processada em janelas de CHECK_INTERVAL bytes
+        codes = []
+        start = 0
+        while start < len(data):
+            end = min(len(data), start + self._window_remaining)
+            window_codes = self._encode(data[start:end])
+            self._window_codes += len(window_codes)
+            self._window_remaining -= end - start
+            codes.extend(window_codes)
+            start = end
+            if not self._window_remaining:
+                self._check_window(codes)
+        return codes
+
+    def flush(self):
+        """Emite o código da sequência pendente e finaliza o fluxo."""
+        if self.prefix is None:
+            return []
+        codes = [self.prefix]
+        self.prefix = None
+        self.codes_out += 1
+        return codes
+
+    def _encode(self, data):
+        """Laço principal: uma consulta na tabela por byte de entrada."""
+        if self._native is not None:
+            return self._encode_native(data)
+        table = self.table
+        max_table_size = self.max_table_size
+        first_code = self.first_code
+        initial_table = self._initial_table
+        reset_when_full = self.reset_when_full
+        next_code = self.next_code
+        stats = self.stats
+        clears = 0
+        codes = []
+
+        symbols = iter(data)
+        prefix = self.prefix
+        lookups = len(data)
+        if prefix is None:
+            prefix = next(symbols, None)
+            if prefix is None:
+                return codes
+            lookups -= 1  # O primeiro byte apenas inicia a sequência
+
+        for byte in symbols:
+            key = (prefix << 8) | byte
+            code = table.get(key)
             if code is not None:
-                codes.append(code)
+                prefix = code
+            else:
+                codes.append(prefix)
+                if next_code < max_table_size:
+                    table[key] = next_code
+                    next_code += 1
+                    if stats is not None and next_code == max_table_size:
+                        stats.record_fill(self.codes_out + len(codes))
+                elif reset_when_full:
+                    # Tabela cheia: sinaliza o reinício e recomeça com o dicionário inicial
+                    codes.append(CLEAR_CODE)
+                    clears += 1
+                    table.clear()
+                    table.update(initial_table)
+                    next_code = first_code
+                prefix = byte
+
+        if stats is not None:
+            # Cada falha emite exatamente um código, além dos CLEAR
+            stats.lookups += lookups
+            stats.misses += len(codes) - clears
+        self.prefix = prefix
+        self.next_code = next_code
+        self.codes_out += len(codes)
+        return codes
 
+    def _encode_native(self, data):
+        """Mesmo laço de ``_encode``, executado pelo módulo compilado."""
+        lookups = len(data) - (self.prefix is None and len(data) > 0)
+        codes, prefix, clears, fill = self._native.encode(data, -1 if self.prefix is None else self.prefix)
+        stats = self.stats
+        if stats is not None:
+            if fill >= 0:
+                stats.record_fill(self.codes_out + fill)
+            stats.lookups += lookups
+            stats.misses += len(codes) - clears
+        self.prefix = None if prefix < 0 else prefix
+        self.next_code = self._native.next_code
+        self.codes_out += len(codes)
         return codes
+
+    def _check_window(self, codes):
+        """Fecha uma janela da política adaptativa e reinicia o dicionário se a taxa caiu."""
+        if self.next_code >= self.max_table_size and self._monitor.should_reset(CHECK_INTERVAL, self._window_codes):
+            codes.append(self.prefix)
+            codes.append(CLEAR_CODE)
+            self.codes_out += 2
+            if self._native is not None:
+                self._native.reset()
+            else:
+                self.table.clear()
+                self.table.update(self._initial_table)
+            self.next_code = self.first_code
+            self.prefix = None
+            self._monitor.reset()
+        self._window_remaining = CHECK_INTERVAL
+        self._window_codes = 0
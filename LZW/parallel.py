@@ -0,0 +1,30 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+def ordered_map(function, items, workers=None, initializer=None, initargs=()):
+    """Aplica ``function`` a cada item em um pool de processos, produzindo os resultados na ordem de entrada.
+
+    No máximo ``2 * workers`` tarefas ficam pendentes ao mesmo tempo, então os itens
+    são consumidos sob demanda e a memória fica limitada mesmo para entradas enormes.
+    Com ``workers == 1`` tudo roda no processo atual, sem o custo de criar o pool.
+    ``initializer(*initargs)`` roda uma vez em cada processo antes das tarefas, para
+    preparar estado reaproveitado por todas elas.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for item in items:
+            yield function(item)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(function, item))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
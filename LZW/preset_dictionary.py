@@ -0,0 +1,160 @@
+import zlib
+from struct import Struct
+
+from .dictionary_policy import first_code_for
+
+PRESET_MAGIC = b"LZD"
+PRESET_FORMAT_VERSION = 1
+DEFAULT_PRESET_ENTRIES = 1024  # Entradas treinadas por padrão; cabem na tabela a partir de 11 bits
+TRAINING_TABLE_SIZE = 1 << 16  # Limite da tabela do LZW usado para extrair sequências das amostras
+
+_HEADER = Struct(">3sBI")  # Assinatura, versão do formato, número de entradas
+_ENTRY = Struct(">IB")  # Prefixo (byte < 256 ou 256 + índice de uma entrada anterior), último byte
+
+
+class PresetDictionary:
+    """Dicionário pré-definido: sequências carregadas no LZW antes do primeiro byte da entrada.
+
+    As entradas ficam na ordem dos códigos e cada uma é uma entrada anterior (ou um byte)
+    seguida de um byte, como as que o próprio LZW cria; por isso cabem direto na tabela
+    (prefixo, byte) do codificador. Uma tabela menor que o dicionário recebe só as
+    primeiras entradas, que continuam fechadas por prefixo. O ``id`` (CRC32 das entradas)
+    vai no cabeçalho do arquivo comprimido para o decodificador usar o mesmo dicionário.
+    """
+
+    def __init__(self, entries):
+        self.entries = []
+        self._pairs = []  # (referência do prefixo, último byte) de cada entrada
+        positions = {}
+        for entry in entries:
+            entry = bytes(entry)
+            if len(entry) < 2:
+                raise ValueError("Entradas do dicionário pré-definido devem ter pelo menos 2 bytes.")
+            if entry in positions:
+                raise ValueError(f"Entrada repetida no dicionário pré-definido: {entry!r}.")
+            prefix = entry[:-1]
+            if len(prefix) == 1:
+                reference = prefix[0]
+            elif prefix in positions:
+                reference = 256 + positions[prefix]
+            else:
+                raise ValueError(f"O prefixo da entrada {entry!r} deve aparecer antes dela no dicionário.")
+            positions[entry] = len(self.entries)
+            self.entries.append(entry)
+            self._pairs.append((reference, entry[-1]))
+
+        self._payload = b"".join(_ENTRY.pack(*pair) for pair in self._pairs)
+        self.id = zlib.crc32(self._payload) or 1  # Zero no cabeçalho significa "sem dicionário"
+        self._tables = {}  # Tabelas do codificador já montadas, por (primeiro código, tamanho)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def encoder_table(self, first_code, size):
+        """Tabela (prefixo << 8) | byte -> código das ``size`` primeiras entradas, a partir de ``first_code``.
+
+        A tabela fica em cache e não deve ser modificada; quem for estendê-la faz uma cópia.
+        """
+        table = self._tables.get((first_code, size))
+        if table is None:
+            table = {}
+            for offset, (reference, byte) in enumerate(self._pairs[:size]):
+                prefix = reference if reference < 256 else first_code + reference - 256
+                table[(prefix << 8) | byte] = first_code + offset
+            self._tables[(first_code, size)] = table
+        return table
+
+    def to_bytes(self):
+        """Serializa o dicionário no formato .lzd."""
+        return _HEADER.pack(PRESET_MAGIC, PRESET_FORMAT_VERSION, len(self._pairs)) + self._payload
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Lê um dicionário serializado por ``to_bytes``."""
+        if len(data) < _HEADER.size:
+            raise ValueError("Dicionário pré-definido truncado: cabeçalho incompleto.")
+        magic, version, count = _HEADER.unpack_from(data)
+        if magic != PRESET_MAGIC:
+            raise ValueError("Arquivo não é um dicionário pré-definido .lzd.")
+        if version != PRESET_FORMAT_VERSION:
+            raise ValueError(f"Versão de dicionário pré-definido não suportada: {version}.")
+        if len(data) != _HEADER.size + count * _ENTRY.size:
+            raise ValueError("Dicionário pré-definido truncado ou com bytes extras.")
+
+        entries = []
+        for reference, byte in _ENTRY.iter_unpack(memoryview(data)[_HEADER.size:]):
+            if reference < 256:
+                prefix = bytes((reference,))
+            elif reference - 256 < len(entries):
+                prefix = entries[reference - 256]
+            else:
+                raise ValueError(f"Referência de prefixo inválida no dicionário pré-definido: {reference}.")
+            entries.append(prefix + bytes((byte,)))
+        return cls(entries)
+
+    def save(self, filepath):
+        """Grava o dicionário em disco."""
+        with open(filepath, "wb") as file:
+            file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, filepath):
+        """Carrega um dicionário gravado por ``save``."""
+        with open(filepath, "rb") as file:
+            return cls.from_bytes(file.read())
+
+
+def preset_size(preset, max_bits, policy):
+    """Quantas entradas do dicionário pré-definido cabem na tabela de max_bits (zero sem dicionário)."""
+    if preset is None:
+        return 0
+    return max(0, min(len(preset), (1 << max_bits) - first_code_for(policy)))
+
+
+def resolve_preset(preset_id, preset=None):
+    """Confere o dicionário informado com o ID gravado no cabeçalho e retorna o que deve ser usado."""
+    if not preset_id:
+        return None
+    if preset is None:
+        raise ValueError(f"O arquivo foi comprimido com o dicionário pré-definido {preset_id:08x}; informe-o.")
+    if preset.id != preset_id:
+        raise ValueError(f"Dicionário pré-definido incorreto: o arquivo usa {preset_id:08x}, "
+                         f"mas foi informado {preset.id:08x}.")
+    return preset
+
+
+def train_preset(samples, max_entries=DEFAULT_PRESET_ENTRIES):
+    """Treina um dicionário pré-definido a partir de amostras (bytes) parecidas com os arquivos a comprimir.
+
+    As amostras passam em sequência por um LZW simples com uma única tabela, para que as
+    frases comuns a vários arquivos cresçam até o tamanho com que se repetem no conjunto.
+    Cada sequência emitida soma como pontuação os bytes que ela economiza (comprimento - 1).
+    As sequências mais pontuadas entram no dicionário junto com os seus prefixos, até
+    ``max_entries`` entradas, ordenadas por comprimento.
+    """
+    scores = {}
+    known = set()
+    for sample in samples:
+        data = bytes(sample)
+        start = 0
+        for end in range(2, len(data) + 1):
+            if data[start:end] in known:
+                continue
+            if end - 1 - start > 1:
+                sequence = data[start:end - 1]
+                scores[sequence] = scores.get(sequence, 0) + len(sequence) - 1
+            if len(known) < TRAINING_TABLE_SIZE:
+                known.add(data[start:end])
+            start = end - 1
+        if len(data) - start > 1:
+            sequence = data[start:]
+            scores[sequence] = scores.get(sequence, 0) + len(sequence) - 1
+
+    chosen = set()
+    for sequence in sorted(scores, key=lambda sequence: (-scores[sequence], len(sequence), sequence)):
+        missing = [sequence[:end] for end in range(2, len(sequence) + 1) if sequence[:end] not in chosen]
+        if len(chosen) + len(missing) <= max_entries:
+            chosen.update(missing)
+            if len(chosen) == max_entries:
+                break
+    return PresetDictionary(sorted(chosen, key=lambda sequence: (len(sequence), sequence)))
@@ -0,0 +1,67 @@
+import time
+from contextlib import contextmanager
+
+from .bit_stream import width_counts
+
+
+class CodecStats:
+    """Contadores opcionais de uma compressão ou descompressão.
+
+    Codificador e decodificador só preenchem os contadores quando recebem um objeto desta
+    classe; sem ele o laço principal não faz nenhum trabalho extra. Quando a compressão
+    faz várias passadas (ajuste de max_bits), os contadores descrevem a última.
+    """
+
+    def __init__(self):
+        self.passes = 0  # Passadas completas sobre a entrada
+        self.phase_times = {}  # Segundos gastos em cada fase (leitura, codificação, escrita...)
+        self.lookups = 0  # Consultas ao dicionário
+        self.misses = 0  # Consultas sem sucesso
+        self.trie_nodes_visited = 0  # Nós percorridos nas buscas da Trie (apenas backend "trie")
+        self.fill_point = None  # Códigos emitidos (ou lidos) quando a tabela encheu pela primeira vez
+        self.fill_time = None  # Segundos desde o início da passada até a tabela encher
+        self.codes_per_width = {}  # Largura em bits -> quantidade de códigos
+        self._pass_start = time.perf_counter()
+
+    def start_pass(self):
+        """Zera os contadores no início de uma passada do codificador ou do decodificador."""
+        self.passes += 1
+        self.lookups = 0
+        self.misses = 0
+        self.trie_nodes_visited = 0
+        self.fill_point = None
+        self.fill_time = None
+        self.codes_per_width = {}
+        self._pass_start = time.perf_counter()
+
+    def record_fill(self, codes_count):
+        """Registra o momento em que a tabela encheu, se ainda não foi registrado nesta passada."""
+        if self.fill_point is None:
+            self.fill_point = codes_count
+            self.fill_time = time.perf_counter() - self._pass_start
+
+    def count_widths(self, codes, max_bits, first_code, clear_code=None):
+        """Conta os códigos por largura em bits, como ficam no arquivo empacotado."""
+        self.codes_per_width = width_counts(codes, max_bits, first_code, clear_code)
+
+    @contextmanager
+    def phase(self, name):
+        """Soma ao tempo da fase ``name`` a duração do bloco ``with``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_times[name] = self.phase_times.get(name, 0.0) + time.perf_counter() - start
+
+    def as_dict(self):
+        """Retorna os contadores em um dicionário simples, pronto para JSON ou CSV."""
+        return {
+            "passes": self.passes,
+            "lookups": self.lookups,
+            "misses": self.misses,
+            "trie_nodes_visited": self.trie_nodes_visited,
+            "fill_point": self.fill_point,
+            "fill_time": self.fill_time,
+            "codes_per_width": dict(sorted(self.codes_per_width.items())),
+            "phase_times": dict(self.phase_times),
+        }
@@ -1,119 +1,242 @@
+_NO_CHILDREN = {}  # Compartilhado (somente leitura) pelos nós ainda sem filhos
+
+
 class TrieNode:
-    """Representa um nó em uma Trie compacta para LZW."""
-    def __init__(self):
-        self.children = {}
+    """Representa um nó em uma Trie compacta para LZW.
+
+    Usa ``__slots__`` (sem ``__dict__`` por nó) e só cria o dicionário de filhos quando o
+    primeiro filho é inserido; a maioria dos nós do LZW são folhas. Os filhos são
+    indexados pelo primeiro símbolo da aresta, que é única entre irmãos.
+    """
+    __slots__ = ("children", "code", "value")
+
+    def __init__(self, value=""):
+        self.children = _NO_CHILDREN
         self.code = None
-        self.value = ""  # Armazena a sequência de caracteres compactados
+        self.value = value  # Sequência de caracteres compactados da aresta que chega ao nó
+
+    def add_child(self, node):
+        """Liga ``node`` como filho, indexado pelo primeiro símbolo da sua aresta."""
+        if self.children is _NO_CHILDREN:
+            self.children = {}
+        self.children[node.value[0]] = node
+
+
+def _split_edge(parent, child, offset):
+    """Divide a aresta de ``parent`` para ``child`` após ``offset`` caracteres e retorna o nó intermediário.
+
+    O nó ``child`` continua sendo o mesmo objeto (só a sua aresta encurta pelo início),
+    então cursores posicionados nele permanecem válidos.
+    """
+    label = child.value
+    split_node = TrieNode(label[:offset])
+    child.value = label[offset:]
+    split_node.add_child(child)
+    parent.children[split_node.value[0]] = split_node
+    return split_node
+
+
+class TrieCursor:
+    """Posição na Trie usada para estender uma correspondência um símbolo por vez.
+
+    ``remaining`` é quantos caracteres da aresta de ``node`` ainda faltam percorrer
+    (zero quando o cursor está exatamente no nó). Um cursor exatamente em um nó continua
+    válido depois de inserções, pois a divisão de arestas preserva os nós existentes; um
+    cursor no meio de uma aresta deve ser descartado quando a Trie é modificada.
+    """
+    __slots__ = ("trie", "node", "parent", "remaining")
+
+    def __init__(self, trie, node, parent=None, remaining=0):
+        self.trie = trie
+        self.node = node
+        self.parent = parent
+        self.remaining = remaining
+
+    @property
+    def code(self):
+        """Código da sequência percorrida até aqui, ou None se ela não está no dicionário."""
+        return None if self.remaining else self.node.code
+
+    def step(self, symbol):
+        """Avança o cursor por ``symbol`` e retorna o novo cursor, ou None se o caminho não existe."""
+        node, parent, remaining = self.node, self.parent, self.remaining
+        i = 0
+        length = len(symbol)
+        visited = 0
+        while i < length:
+            if not remaining:
+                child = node.children.get(symbol[i])
+                if child is None:
+                    self.trie.nodes_visited += visited
+                    return None
+                parent, node = node, child
+                remaining = len(child.value)
+                visited += 1
+
+            label = node.value
+            start = len(label) - remaining
+            if not start and remaining <= length - i:
+                # Caso comum: a aresta inteira cabe no que resta do símbolo
+                if not symbol.startswith(label, i):
+                    self.trie.nodes_visited += visited
+                    return None
+                i += remaining
+                remaining = 0
+            else:
+                taken = min(remaining, length - i)
+                if not label.startswith(symbol[i:i + taken], start):
+                    self.trie.nodes_visited += visited
+                    return None
+                i += taken
+                remaining -= taken
+        self.trie.nodes_visited += visited
+        return TrieCursor(self.trie, node, parent, remaining)
+
+    def add_child(self, symbol, code):
+        """Insere a sequência atual seguida de ``symbol`` com o código dado e retorna o cursor dela."""
+        node = self.node
+        if self.remaining:
+            # O cursor está no meio de uma aresta: divide-a para criar o nó da posição atual
+            node = _split_edge(self.parent, node, len(node.value) - self.remaining)
+        parent, child = self.trie._insert_from(node, symbol, code)
+        return TrieCursor(self.trie, child, parent)
+
 
 class Trie:
-    """Implementa uma Trie compacta para gerenciar o dicionário LZW."""
+    """Implementa uma Trie compacta para gerenciar o dicionário LZW.
+
+    Cada passo da busca é uma consulta ao dicionário de filhos pelo próximo símbolo, seguida
+    da comparação da aresta no lugar (``str.startswith`` com posição, sem fatiar a chave).
+    Quando uma nova chave diverge no meio de uma aresta, a aresta é dividida no ponto de
+    divergência, então irmãos nunca começam pelo mesmo símbolo.
+    """
     def __init__(self):
         self.root = TrieNode()
+        self.nodes_visited = 0  # Nós percorridos por search, para as estatísticas do codificador
+        self._snapshot = None  # Estado de cada nó no momento do último ``snapshot``
+
+    def snapshot(self):
+        """Guarda o estado atual da Trie para que ``restore`` volte a ele sem reconstruí-la.
+
+        Guarda apenas (nó, filhos, aresta, código) dos nós existentes agora; os nós criados
+        depois simplesmente deixam de ser alcançáveis. Cursores posicionados exatamente em
+        um desses nós continuam válidos após ``restore``.
+        """
+        state = []
+        pending = [self.root]
+        while pending:
+            node = pending.pop()
+            children = node.children
+            state.append((node, dict(children) if children else None, node.value, node.code))
+            pending.extend(children.values())
+        self._snapshot = state
+
+    def restore(self):
+        """Volta ao estado do último ``snapshot``, reaproveitando os mesmos nós."""
+        for node, children, value, code in self._snapshot:
+            if children is None:
+                node.children = _NO_CHILDREN
+            else:
+                node.children = dict(children)
+            node.value = value
+            node.code = code
+        self.nodes_visited = 0
 
     def insert(self, string, code):
         """Insere uma string compactada na Trie associada a um código."""
-        node = self.root
+        self._insert_from(self.root, string, code)
+
+    def _insert_from(self, node, string, code):
+        """Insere ``string`` abaixo de ``node`` e retorna (pai, nó) da entrada inserida."""
+        parent = None
         i = 0
-        while i < len(string):
-            found = False
-            for child_value, child_node in node.children.items():
-                match_len = len(child_value)
-                if string[i:].startswith(child_value):
-                    node = child_node
-                    i += match_len
-                    found = True
-                    break
-                elif string[i:i + match_len] == child_value[:match_len]:
-                    split_node = TrieNode()
-                    split_node.value = child_value[:match_len]
-                    split_node.children[child_value[match_len:]] = child_node
-                    node.children[string[i:i + match_len]] = split_node
-                    node = split_node
-                    i += match_len
-                    found = True
-                    break
-            if not found:
-                new_node = TrieNode()
-                new_node.value = string[i:]
-                node.children[string[i:]] = new_node
-                node = new_node
-                i = len(string)
+        length = len(string)
+        while i < length:
+            child = node.children.get(string[i])
+            if child is None:
+                # Nenhuma aresta começa por este símbolo: o resto da chave vira uma folha
+                child = TrieNode(string[i:])
+                node.add_child(child)
+                parent, node = node, child
+                break
+
+            label = child.value
+            if string.startswith(label, i):
+                parent, node = node, child
+                i += len(label)
+                continue
+
+            # A chave diverge (ou termina) no meio da aresta: divide a aresta no ponto comum
+            common = 1
+            limit = min(len(label), length - i)
+            while common < limit and label[common] == string[i + common]:
+                common += 1
+            parent, node = node, _split_edge(node, child, common)
+            i += common
         node.code = code
+        return parent, node
+
+    def cursor(self):
+        """Retorna um cursor posicionado na raiz, para percorrer a Trie um símbolo por vez."""
+        return TrieCursor(self, self.root)
 
     def search(self, string):
         """Busca uma string na Trie compacta. Retorna o código ou None se não encontrado."""
         node = self.root
         i = 0
-        while i < len(string):
-            found = False
-            for child_value, child_node in node.children.items():
-                if string[i:].startswith(child_value):
-                    node = child_node
-                    i += len(child_value)
-                    found = True
-                    break
-            if not found:
+        length = len(string)
+        visited = 0
+        while i < length:
+            node = node.children.get(string[i])
+            if node is None or not string.startswith(node.value, i):
+                self.nodes_visited += visited
                 return None
+            i += len(node.value)
+            visited += 1
+        self.nodes_visited += visited
         return node.code
-    def delete(self, string):
-        """Remove uma string da Trie compacta se ela existir."""
-
-        def _delete(node, string, depth, parent=None, parent_key=None):
-            # Caso base: fim da string
-            if depth == len(string):
-                if node.code is not None:
-                    node.code = None  # Remove o código
-                    # Se o nó não tem filhos, ele pode ser removido
-                    return len(node.children) == 0
-                return False  # A string não estava armazenada como código
-
-            # Percorre os filhos para encontrar o próximo segmento
-            for child_value, child_node in list(node.children.items()):
-                if string[depth:].startswith(child_value):
-                    # Chamada recursiva no nó filho
-                    should_delete_child = _delete(child_node, string, depth + len(child_value), node, child_value)
 
-                    # Se o filho deve ser removido, faz a exclusão
-                    if should_delete_child:
-                        del node.children[child_value]
-
-                        # Verifica se o nó atual se tornou um nó intermediário desnecessário
-                        if parent and len(node.children) == 1 and node.code is None:
-                            # Obtenha o único filho remanescente e combine com o pai
-                            only_child_key, only_child_node = next(iter(node.children.items()))
-                            combined_key = child_value + only_child_key
-
-                            # Reatribui o filho combinado ao nó avô
-                            parent.children[parent_key] = only_child_node
-                            only_child_node.value = combined_key  # Atualiza o valor combinado
-
-                        # Retorna True para indicar que o nó atual também pode ser excluído
-                        return len(node.children) == 0 and node.code is None
-                    return True
-
-            return False  # Se a string não corresponde a um caminho válido
+    def delete(self, string):
+        """Remove uma string da Trie compacta se ela existir. Retorna True se algo foi removido."""
+        path = []  # Ancestrais do nó da chave, da raiz para baixo
+        node = self.root
+        i = 0
+        while i < len(string):
+            child = node.children.get(string[i])
+            if child is None or not string.startswith(child.value, i):
+                return False
+            path.append(node)
+            node = child
+            i += len(child.value)
+        if node.code is None:
+            return False  # A string não estava armazenada como código
+        node.code = None
 
-        # Inicia a remoção a partir da raiz
-        return _delete(self.root, string, 0)
+        # Uma folha sem código é removida do pai
+        if not node.children and path:
+            parent = path.pop()
+            del parent.children[node.value[0]]
+            node = parent
 
+        # Um nó intermediário sem código e com um único filho é fundido com esse filho
+        if path and node.code is None and len(node.children) == 1:
+            only_child = next(iter(node.children.values()))
+            only_child.value = node.value + only_child.value
+            path[-1].children[only_child.value[0]] = only_child
+        return True
 
     def starts_with(self, prefix):
         """Verifica se existe uma string na Trie que começa com o prefixo dado."""
         node = self.root
         i = 0
         while i < len(prefix):
-            found = False
-            for child_value, child_node in node.children.items():
-                # Modificação para aceitar prefixos incompletos
-                if prefix[i:].startswith(child_value):
-                    node = child_node
-                    i += len(child_value)
-                    found = True
-                    break
-                elif child_value.startswith(prefix[i:]):
-                    return True  # Prefixo é uma subsequência de um nó existente
-            if not found:
+            node = node.children.get(prefix[i])
+            if node is None:
                 return False
+            if not prefix.startswith(node.value, i):
+                # O prefixo termina (ou diverge) no meio da aresta
+                return node.value.startswith(prefix[i:])
+            i += len(node.value)
         return True
 
     def show(self):
@@ -121,7 +244,7 @@ class Trie:
         def _show(node, prefix):
             if node.code is not None:
                 print(f"{prefix}: {node.code}")
-            for child_value, child_node in node.children.items():
-                _show(child_node, prefix + child_value)
+            for child_node in node.children.values():
+                _show(child_node, prefix + child_node.value)
 
         _show(self.root, "")
@@ -0,0 +1,132 @@
+import os
+import sys
+import argparse
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from LZW.lzw_encoder import LZWCompressor, LZWEncoder, _lzw_accel
+from LZW.lzw_decoder import LZWDecoder
+from LZW.bit_stream import pack_codes, unpack_codes
+from LZW.container import HEADER_SIZE, content_checksum, pack_header
+from LZW.dictionary_policy import POLICIES, clear_code_for
+from LZW.preset_dictionary import train_preset
+from LZW.stats import CodecStats
+from utils.utils import read_file
+
+# Configuração padrão
+test_dir = "tests/lzw_test_cases"
+default_max_bits = [9, 12, 16]
+STREAM_CHUNK_SIZE = 4093  # Blocos da compressão incremental, com tamanho que não divide as janelas da política adaptativa
+
+
+def compress_stream(data, max_bits, policy, backend, preset=None, stats=None):
+    """Comprime com o backend dado e retorna o conteúdo completo do arquivo .lzw e o tempo em segundos."""
+    encoder = LZWEncoder(max_bits, backend=backend, policy=policy, stats=stats, preset=preset)
+    start = time.perf_counter()
+    codes = encoder.compress(data)
+    elapsed = time.perf_counter() - start
+    header = pack_header(encoder.max_bits, policy, preset.id if preset is not None else 0, len(data), content_checksum(data))
+    codes = list(codes) if not isinstance(codes, list) else codes
+    return header + pack_codes(codes, encoder.max_bits, encoder.first_code, clear_code_for(policy)), encoder, elapsed
+
+
+def compress_chunked(data, max_bits, policy, backend, preset=None):
+    """Códigos da compressão incremental (``LZWCompressor``) em blocos de STREAM_CHUNK_SIZE bytes."""
+    compressor = LZWCompressor(max_bits, policy, preset=preset, backend=backend)
+    codes = []
+    for start in range(0, len(data), STREAM_CHUNK_SIZE):
+        codes.extend(compressor.feed(data[start:start + STREAM_CHUNK_SIZE]))
+    codes.extend(compressor.flush())
+    return codes
+
+
+def check_file(name, data, max_bits, policy, preset=None):
+    """Compara os backends "dict" e "native" em um arquivo; retorna (divergências, tempos por backend)."""
+    problems = []
+    times = {}
+    streams = {}
+    stats = {}
+    for backend in ("dict", "native"):
+        stats[backend] = CodecStats()
+        streams[backend], encoder, times[f"encode {backend}"] = compress_stream(data, max_bits, policy, backend, preset,
+                                                                                stats[backend])
+    if streams["dict"] != streams["native"]:
+        problems.append("arquivo .lzw diferente")
+    if (stats["dict"].lookups, stats["dict"].misses, stats["dict"].fill_point) != \
+            (stats["native"].lookups, stats["native"].misses, stats["native"].fill_point):
+        problems.append("contadores do codificador diferentes")
+    if compress_chunked(data, max_bits, policy, "dict", preset) != compress_chunked(data, max_bits, policy, "native", preset):
+        problems.append("compressão incremental diferente")
+
+    # Decodifica os mesmos códigos com os dois backends
+    codes = unpack_codes(streams["dict"][HEADER_SIZE:], encoder.max_bits, encoder.first_code,
+                         clear_code_for(policy))
+    outputs = {}
+    for backend in ("dict", "native"):
+        stats[backend] = CodecStats()
+        decoder = LZWDecoder(encoder.max_bits, policy, backend=backend, stats=stats[backend], preset=preset)
+        start = time.perf_counter()
+        outputs[backend] = decoder.decompress(codes, len(data))
+        times[f"decode {backend}"] = time.perf_counter() - start
+    if outputs["dict"] != outputs["native"]:
+        problems.append("saída descomprimida diferente")
+    elif outputs["native"] != data:
+        problems.append("saída descomprimida difere do original")
+    if (stats["dict"].lookups, stats["dict"].misses, stats["dict"].fill_point) != \
+            (stats["native"].lookups, stats["native"].misses, stats["native"].fill_point):
+        problems.append("contadores do decodificador diferentes")
+
+    return [f"{name} max_bits={max_bits} policy={policy}{' preset' if preset else ''}: {problem}"
+            for problem in problems], times
+
+
+def run_parity(files, max_bits_values, policies, with_preset=True):
+    """Executa a comparação em todos os arquivos e configurações; retorna (divergências, tempos somados, bytes)."""
+    samples = {os.path.basename(path): read_file(path) for path in files}
+    presets = [None]
+    if with_preset:
+        presets.append(train_preset(data for data in samples.values() if len(data) < 1 << 16))
+
+    problems = []
+    totals = {}
+    total_bytes = 0
+    for preset in presets:
+        for policy in policies:
+            for max_bits in max_bits_values:
+                for name, data in samples.items():
+                    found, times = check_file(name, data, max_bits, policy, preset)
+                    problems.extend(found)
+                    for key, value in times.items():
+                        totals[key] = totals.get(key, 0.0) + value
+                    total_bytes += len(data)
+    return problems, totals, total_bytes
+
+
+def parse_args(argv=None):
+    """Lê as opções da linha de comando."""
+    parser = argparse.ArgumentParser(description="Confere que o módulo compilado gera os mesmos fluxos que o Python.")
+    parser.add_argument("files", nargs="*", help="Arquivos comparados (padrão: todos em tests/lzw_test_cases)")
+    parser.add_argument("--max-bits", type=int, nargs="+", default=default_max_bits)
+    parser.add_argument("--policy", nargs="+", default=list(POLICIES), choices=POLICIES)
+    parser.add_argument("--no-preset", action="store_true", help="Não repete a comparação com um dicionário pré-definido")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if _lzw_accel is None:
+        print("Módulo _lzw_accel não compilado; execute python LZW/build_accel.py.")
+        sys.exit(1)
+
+    files = args.files or sorted(os.path.join(test_dir, name) for name in os.listdir(test_dir))
+    problems, totals, total_bytes = run_parity(files, args.max_bits, args.policy, not args.no_preset)
+
+    megabytes = total_bytes / 1e6
+    for stage in ("encode", "decode"):
+        python_time, native_time = totals[f"{stage} dict"], totals[f"{stage} native"]
+        print(f"{stage}: Python {megabytes / python_time:.2f} MB/s, compilado {megabytes / native_time:.2f} MB/s "
+              f"({python_time / native_time:.1f}x)")
+    for problem in problems:
+        print(f"DIVERGÊNCIA: {problem}")
+    print(f"{len(problems)} divergências em {len(files)} arquivos.")
+    sys.exit(1 if problems else 0)
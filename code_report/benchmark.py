@@ -0,0 +1,193 @@
+import os
+import sys
+import csv
+import json
+import argparse
+import statistics
+import time
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from LZW.container import unpack_header
+from LZW.dictionary_policy import FREEZE
+from utils.utils import compress_bytes, decompress_bytes, read_file
+
+# Configuração padrão
+test_dir = "tests/lzw_test_cases"
+default_output = "tests/benchmark_report.json"
+default_max_bits = list(range(12, 17))
+
+# Colunas do relatório, na ordem em que aparecem no CSV
+FIELDS = [
+    "File", "File Extension", "Max Bits", "Used Max Bits", "Policy", "Match Original",
+    "Original Size (bytes)", "Compressed Size (bytes)", "Compression Ratio",
+    "Compression Time (ns)", "Decompression Time (ns)",
+    "Compression Throughput (MB/s)", "Decompression Throughput (MB/s)",
+    "Compression Peak Memory (bytes)", "Decompression Peak Memory (bytes)",
+]
+
+# Métricas comparadas com o baseline: (coluna, True se valores maiores são melhores)
+TRACKED_METRICS = [
+    ("Compression Throughput (MB/s)", True),
+    ("Decompression Throughput (MB/s)", True),
+    ("Compression Ratio", True),
+    ("Compression Peak Memory (bytes)", False),
+    ("Decompression Peak Memory (bytes)", False),
+]
+
+
+# ----------------- Medições -----------------
+def measure_time(function, *args, repeat=5, warmup=1):
+    """Executa a função ``warmup`` vezes sem medir e depois ``repeat`` vezes com ``perf_counter_ns``.
+
+    Retorna a mediana dos tempos em nanossegundos e o resultado da última execução.
+    """
+    for _ in range(warmup):
+        function(*args)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        result = function(*args)
+        timings.append(time.perf_counter_ns() - start)
+    return statistics.median(timings), result
+
+
+def measure_peak_memory(function, *args):
+    """Executa a função uma vez sob ``tracemalloc`` e retorna o pico de memória alocada, em bytes.
+
+    Fica separado da medição de tempo porque o ``tracemalloc`` deixa as alocações mais lentas.
+    """
+    tracemalloc.start()
+    try:
+        function(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def throughput(size, nanoseconds):
+    """Converte bytes processados e tempo em nanossegundos para MB/s."""
+    return size / 1e6 / (nanoseconds / 1e9) if nanoseconds else None
+
+
+def benchmark_file(filepath, max_bits, policy=FREEZE, repeat=5, warmup=1):
+    """Mede compressão e descompressão de um arquivo, em processo, e retorna uma linha do relatório."""
+    data = read_file(filepath)
+    # compress_bytes usa um codificador sem verbose: nenhum aviso é escrito no stdout dentro da medição
+    compress_ns, compressed = measure_time(compress_bytes, data, max_bits, policy, repeat=repeat, warmup=warmup)
+    decompress_ns, decompressed = measure_time(decompress_bytes, compressed, repeat=repeat, warmup=warmup)
+
+    return {
+        "File": os.path.basename(filepath),
+        "File Extension": os.path.splitext(filepath)[1],
+        "Max Bits": max_bits,
+        "Used Max Bits": unpack_header(compressed).max_bits,
+        "Policy": policy,
+        "Match Original": bytes(decompressed) == data,
+        "Original Size (bytes)": len(data),
+        "Compressed Size (bytes)": len(compressed),
+        "Compression Ratio": len(data) / len(compressed),
+        "Compression Time (ns)": compress_ns,
+        "Decompression Time (ns)": decompress_ns,
+        "Compression Throughput (MB/s)": throughput(len(data), compress_ns),
+        "Decompression Throughput (MB/s)": throughput(len(data), decompress_ns),
+        "Compression Peak Memory (bytes)": measure_peak_memory(compress_bytes, data, max_bits, policy),
+        "Decompression Peak Memory (bytes)": measure_peak_memory(decompress_bytes, compressed),
+    }
+
+
+def run_benchmark(files, max_bits_values, policy=FREEZE, repeat=5, warmup=1):
+    """Mede todos os pares (arquivo, max_bits) e retorna a lista de resultados."""
+    results = []
+    for max_bits in max_bits_values:
+        for filepath in files:
+            result = benchmark_file(filepath, max_bits, policy, repeat, warmup)
+            results.append(result)
+            print(f"{result['File']:<30} max_bits={max_bits:<3} "
+                  f"taxa={result['Compression Ratio']:.3f} "
+                  f"compressão={result['Compression Throughput (MB/s)'] or 0:.2f} MB/s "
+                  f"descompressão={result['Decompression Throughput (MB/s)'] or 0:.2f} MB/s")
+    return results
+
+
+# ----------------- Relatório e Baseline -----------------
+def save_json(results, path):
+    """Salva os resultados em JSON, no formato aceito como baseline."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as file:
+        json.dump({"python": sys.version.split()[0], "results": results}, file, indent=2)
+
+
+def save_csv(results, path):
+    """Salva os resultados em CSV, uma linha por par (arquivo, max_bits)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def load_baseline(path):
+    """Carrega um relatório JSON salvo anteriormente."""
+    with open(path) as file:
+        return json.load(file)["results"]
+
+
+def compare_with_baseline(results, baseline, tolerance=0.10):
+    """Compara os resultados com o baseline e retorna a lista de regressões encontradas.
+
+    Uma métrica regride quando piora mais que ``tolerance`` (fração) em relação ao baseline.
+    Uma divergência com o arquivo original sempre conta como regressão.
+    """
+    reference = {(row["File"], row["Max Bits"], row["Policy"]): row for row in baseline}
+    regressions = []
+    for row in results:
+        key = (row["File"], row["Max Bits"], row["Policy"])
+        if not row["Match Original"]:
+            regressions.append((key, "Match Original", True, False))
+        previous = reference.get(key)
+        if previous is None:
+            continue
+        for metric, higher_is_better in TRACKED_METRICS:
+            old, new = previous.get(metric), row[metric]
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append((key, metric, old, new))
+    return regressions
+
+
+def parse_args(argv=None):
+    """Lê as opções da linha de comando."""
+    parser = argparse.ArgumentParser(description="Benchmark em processo do LZWEncoder/LZWDecoder.")
+    parser.add_argument("files", nargs="*", help="Arquivos medidos (padrão: todos em tests/lzw_test_cases)")
+    parser.add_argument("--max-bits", type=int, nargs="+", default=default_max_bits)
+    parser.add_argument("--policy", default=FREEZE)
+    parser.add_argument("--repeat", type=int, default=5, help="Execuções medidas por arquivo")
+    parser.add_argument("--warmup", type=int, default=1, help="Execuções descartadas antes da medição")
+    parser.add_argument("--output", default=default_output, help="Relatório JSON")
+    parser.add_argument("--csv", help="Também salva o relatório em CSV")
+    parser.add_argument("--baseline", help="Relatório JSON anterior para detectar regressões")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Piora aceita em relação ao baseline")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    files = args.files or sorted(os.path.join(test_dir, name) for name in os.listdir(test_dir))
+
+    results = run_benchmark(files, args.max_bits, args.policy, args.repeat, args.warmup)
+    save_json(results, args.output)
+    print(f"Relatório salvo em: {args.output}")
+    if args.csv:
+        save_csv(results, args.csv)
+        print(f"Relatório salvo em: {args.csv}")
+
+    if args.baseline:
+        regressions = compare_with_baseline(results, load_baseline(args.baseline), args.tolerance)
+        for (name, max_bits, policy), metric, old, new in regressions:
+            print(f"REGRESSÃO {name} max_bits={max_bits} {policy}: {metric} {old} -> {new}")
+        if regressions:
+            sys.exit(1)
+        print("Nenhuma regressão em relação ao baseline.")
@@ -1,8 +1,10 @@
 import os
 import sys
 import time
+import json
+import argparse
 import subprocess
-import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import pandas as pd
 import psutil
 import matplotlib.pyplot as plt
@@ -11,23 +13,11 @@ import matplotlib.pyplot as plt
 test_dir = "tests/lzw_test_cases"
 compressed_dir = "tests/lzw_test_cases_compressed"
 decompressed_dir = "tests/lzw_test_cases_decompressed"
-os.makedirs(compressed_dir, exist_ok=True)
-os.makedirs(decompressed_dir, exist_ok=True)
-
-# Lista para armazenar os resultados do relatório
-report_data = []
+report_path = "tests/compression_report.csv"
+progress_path = "tests/compression_report.progress.jsonl"  # Resultados parciais, um por linha, para retomar a varredura
 
 
 # ----------------- Funções Utilitárias -----------------
-def file_hash(filepath):
-    """Calcula o SHA-256 de um arquivo."""
-    hash_sha256 = hashlib.sha256()
-    with open(filepath, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            hash_sha256.update(chunk)
-    return hash_sha256.hexdigest()
-
-
 def get_file_size(filepath):
     """Obtém o tamanho de um arquivo em bytes."""
     return os.path.getsize(filepath) if os.path.exists(filepath) else None
@@ -39,26 +29,31 @@ def get_file_extension(filepath):
 
 
 def monitor_process(cmd):
-    """Executa um comando e monitora o uso de CPU, memória e disco durante sua execução."""
+    """Executa um comando e monitora o uso de CPU, memória e disco durante sua execução.
+
+    A leitura e a escrita em disco são as do próprio processo, e não as do sistema inteiro,
+    para que a medição continue correta com vários comandos rodando em paralelo.
+    """
     process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
     ps_process = psutil.Process(process.pid)
 
     cpu_usage = []
     memory_usage = []
-    disk_io_start = psutil.disk_io_counters()
+    disk_read = 0
+    disk_write = 0
 
     try:
         while process.poll() is None:  # Enquanto o processo estiver rodando
             cpu_usage.append(ps_process.cpu_percent(interval=0.1))
             memory_info = ps_process.memory_info()
             memory_usage.append(memory_info.rss)  # Memória RAM em uso
+            if hasattr(ps_process, "io_counters"):  # Indisponível em algumas plataformas (ex.: macOS)
+                io_counters = ps_process.io_counters()
+                disk_read, disk_write = io_counters.read_bytes, io_counters.write_bytes
             time.sleep(0.1)
-    except psutil.NoSuchProcess:
+    except (psutil.NoSuchProcess, psutil.ZombieProcess):
         pass  # Processo finalizado
-
-    disk_io_end = psutil.disk_io_counters()
-    disk_read = disk_io_end.read_bytes - disk_io_start.read_bytes
-    disk_write = disk_io_end.write_bytes - disk_io_start.write_bytes
+    process.communicate()
 
     return {
         "CPU Usage (%)": sum(cpu_usage) / len(cpu_usage) if cpu_usage else 0,
@@ -70,64 +65,102 @@ def monitor_process(cmd):
 
 
 # ----------------- Processamento de Arquivos -----------------
-for max_bits in range(12, 17):
-    for test_file in os.listdir(test_dir):
-        test_file_path = os.path.join(test_dir, test_file)
-        compressed_file_path = os.path.join(compressed_dir, f"{test_file}.lzw")
-        decompressed_file_path = os.path.join(decompressed_dir, f"{test_file}.decompressed")
-
-        # Obtém a extensão do arquivo original
-        file_extension = get_file_extension(test_file_path)
-
-        # Compressão
-        compress_cmd = ["python3", "main/main.py", "compress", test_file_path, compressed_file_path, str(max_bits)]
-        compress_metrics = monitor_process(compress_cmd)
-
-        # Tamanho dos arquivos
-        original_size = get_file_size(test_file_path)
-        compressed_size = get_file_size(compressed_file_path)
-
-        # Descompressão
-        decompress_cmd = ["python3", "main/main.py", "decompress", compressed_file_path, decompressed_file_path]
-        decompress_metrics = monitor_process(decompress_cmd)
-
-        decompressed_size = get_file_size(decompressed_file_path)
-
-        # Verificar se os arquivos são iguais
-        original_hash = file_hash(test_file_path) if decompressed_size else None
-        decompressed_hash = file_hash(decompressed_file_path) if decompressed_size else None
-        match_original = original_hash == decompressed_hash if decompressed_size else False
-
-        # Registro no relatório
-        report_data.append({
-            "File": test_file,
-            "File Extension": file_extension,
-            "Max Bits": max_bits,
-            "Compression Success": compress_metrics["Return Code"] == 0,
-            "Decompression Success": decompress_metrics["Return Code"] == 0,
-            "Match Original": match_original,
-            "Original Size (bytes)": original_size,
-            "Compressed Size (bytes)": compressed_size,
-            "Decompressed Size (bytes)": decompressed_size,
-            "Compression Ratio (bytes)": compressed_size / decompressed_size if decompressed_size else None,
-            "Decompression Ratio (bytes)": decompressed_size / compressed_size if compressed_size else None,
-            "CPU Compression (%)": compress_metrics["CPU Usage (%)"],
-            "Memory Compression (bytes)": compress_metrics["Memory Usage (bytes)"],
-            "Disk Read Compression (bytes)": compress_metrics["Disk Read (bytes)"],
-            "Disk Write Compression (bytes)": compress_metrics["Disk Write (bytes)"],
-            "CPU Decompression (%)": decompress_metrics["CPU Usage (%)"],
-            "Memory Decompression (bytes)": decompress_metrics["Memory Usage (bytes)"],
-            "Disk Read Decompression (bytes)": decompress_metrics["Disk Read (bytes)"],
-            "Disk Write Decompression (bytes)": decompress_metrics["Disk Write (bytes)"],
-        })
-
-
-# ----------------- Salvando o Relatório -----------------
-report_df = pd.DataFrame(report_data)
-report_path = "tests/compression_report.csv"
-os.makedirs(os.path.dirname(report_path), exist_ok=True)
-report_df.to_csv(report_path, index=False)
-print(f"Relatório salvo em: {report_path}")
+def run_job(test_file, max_bits):
+    """Comprime e descomprime um arquivo com um max_bits e retorna a linha do relatório.
+
+    Cada par (arquivo, max_bits) usa caminhos de saída próprios, então os pares podem rodar em paralelo.
+    """
+    test_file_path = os.path.join(test_dir, test_file)
+    compressed_file_path = os.path.join(compressed_dir, str(max_bits), f"{test_file}.lzw")
+    decompressed_file_path = os.path.join(decompressed_dir, str(max_bits), f"{test_file}.decompressed")
+    os.makedirs(os.path.dirname(compressed_file_path), exist_ok=True)
+    os.makedirs(os.path.dirname(decompressed_file_path), exist_ok=True)
+
+    # Obtém a extensão do arquivo original
+    file_extension = get_file_extension(test_file_path)
+
+    # Compressão
+    compress_cmd = [sys.executable, "main/main.py", "compress", test_file_path, compressed_file_path, str(max_bits)]
+    compress_metrics = monitor_process(compress_cmd)
+
+    # Tamanho dos arquivos
+    original_size = get_file_size(test_file_path)
+    compressed_size = get_file_size(compressed_file_path)
+
+    # Descompressão
+    decompress_cmd = [sys.executable, "main/main.py", "decompress", compressed_file_path, decompressed_file_path]
+    decompress_metrics = monitor_process(decompress_cmd)
+
+    decompressed_size = get_file_size(decompressed_file_path)
+
+    # A descompressão confere o tamanho e o CRC32 gravados no cabeçalho e falha se o conteúdo não confere
+    match_original = decompress_metrics["Return Code"] == 0 and decompressed_size == original_size
+
+    return {
+        "File": test_file,
+        "File Extension": file_extension,
+        "Max Bits": max_bits,
+        "Compression Success": compress_metrics["Return Code"] == 0,
+        "Decompression Success": decompress_metrics["Return Code"] == 0,
+        "Match Original": match_original,
+        "Original Size (bytes)": original_size,
+        "Compressed Size (bytes)": compressed_size,
+        "Decompressed Size (bytes)": decompressed_size,
+        "Compression Ratio (bytes)": compressed_size / decompressed_size if decompressed_size else None,
+        "Decompression Ratio (bytes)": decompressed_size / compressed_size if compressed_size else None,
+        "CPU Compression (%)": compress_metrics["CPU Usage (%)"],
+        "Memory Compression (bytes)": compress_metrics["Memory Usage (bytes)"],
+        "Disk Read Compression (bytes)": compress_metrics["Disk Read (bytes)"],
+        "Disk Write Compression (bytes)": compress_metrics["Disk Write (bytes)"],
+        "CPU Decompression (%)": decompress_metrics["CPU Usage (%)"],
+        "Memory Decompression (bytes)": decompress_metrics["Memory Usage (bytes)"],
+        "Disk Read Decompression (bytes)": decompress_metrics["Disk Read (bytes)"],
+        "Disk Write Decompression (bytes)": decompress_metrics["Disk Write (bytes)"],
+    }
+
+
+def load_progress(path):
+    """Carrega os resultados já registrados por uma varredura anterior, indexados por (arquivo, max_bits)."""
+    done = {}
+    if os.path.exists(path):
+        with open(path) as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Linha incompleta de uma execução interrompida
+                done[(row["File"], row["Max Bits"])] = row
+    return done
+
+
+def run_sweep(max_bits_values, workers=None, resume=False):
+    """Executa a matriz (arquivo, max_bits) em paralelo e retorna as linhas do relatório.
+
+    Cada comando roda em um subprocesso, então um pool de threads basta para ocupar todos os núcleos.
+    Cada resultado é gravado em ``progress_path`` assim que termina; com ``resume`` os pares já
+    registrados são reaproveitados e apenas os que faltam são executados.
+    """
+    done = load_progress(progress_path) if resume else {}
+    jobs = [(test_file, max_bits) for max_bits in max_bits_values for test_file in sorted(os.listdir(test_dir))]
+    pending = [job for job in jobs if job not in done]
+    print(f"{len(jobs) - len(pending)} pares já concluídos, {len(pending)} a executar.")
+
+    os.makedirs(os.path.dirname(progress_path), exist_ok=True)
+    with open(progress_path, "a" if resume else "w") as progress, \
+            ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        if progress.tell():
+            progress.write("\n")  # Isola uma possível linha incompleta deixada pela execução interrompida
+        futures = {executor.submit(run_job, *job): job for job in pending}
+        for future in as_completed(futures):
+            row = future.result()
+            done[futures[future]] = row
+            progress.write(json.dumps(row) + "\n")
+            progress.flush()
+            print(f"{row['File']:<30} max_bits={row['Max Bits']:<3} ok={row['Match Original']}")
+
+    return [done[job] for job in jobs]
 
 
 # ----------------- Funções para Gráficos -----------------
@@ -200,38 +233,57 @@ def plot_boxplot_metrics(df, group_column, value_column, title, xlabel, ylabel):
     plt.show()
 
 
-# ----------------- Geração de Gráficos -----------------
-plot_bar_metrics(
-    report_df,
-    "Max Bits",
-    ["Original Size (bytes)", "Compressed Size (bytes)", "Decompressed Size (bytes)"],
-    "File Sizes by Max Bits",
-    "Size (bytes)"
-)
-
-plot_line_metrics(
-    report_df,
-    "Max Bits",
-    ["CPU Compression (%)", "CPU Decompression (%)"],
-    "CPU Usage by Max Bits",
-    "CPU Usage (%)"
-)
-
-plot_scatter_metrics(
-    report_df,
-    "Original Size (bytes)",
-    ["CPU Compression (%)", "CPU Decompression (%)"],
-    ["CPU Compression", "CPU Decompression"],
-    "CPU Usage vs Original File Size",
-    "Original File Size (bytes)",
-    "CPU Usage (%)"
-)
-
-plot_boxplot_metrics(
-    report_df,
-    "File Extension",
-    "Compressed Size (bytes)",
-    "Distribution of Compressed File Sizes by File Extension",
-    "File Extension",
-    "Compressed Size (bytes)"
-)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Varredura de compressão/descompressão sobre os arquivos de teste.")
+    parser.add_argument("--max-bits", type=int, nargs="+", default=list(range(12, 17)))
+    parser.add_argument("--workers", type=int, help="Pares executados ao mesmo tempo (padrão: número de núcleos)")
+    parser.add_argument("--resume", action="store_true", help="Retoma uma varredura interrompida")
+    parser.add_argument("--no-plots", action="store_true", help="Apenas salva o relatório, sem gerar gráficos")
+    args = parser.parse_args()
+
+    report_data = run_sweep(args.max_bits, args.workers, args.resume)
+
+    # ----------------- Salvando o Relatório -----------------
+    report_df = pd.DataFrame(report_data)
+    os.makedirs(os.path.dirname(report_path), exist_ok=True)
+    report_df.to_csv(report_path, index=False)
+    print(f"Relatório salvo em: {report_path}")
+
+    if args.no_plots:
+        sys.exit(0)
+
+    # ----------------- Geração de Gráficos -----------------
+    plot_bar_metrics(
+        report_df,
+        "Max Bits",
+        ["Original Size (bytes)", "Compressed Size (bytes)", "Decompressed Size (bytes)"],
+        "File Sizes by Max Bits",
+        "Size (bytes)"
+    )
+
+    plot_line_metrics(
+        report_df,
+        "Max Bits",
+        ["CPU Compression (%)", "CPU Decompression (%)"],
+        "CPU Usage by Max Bits",
+        "CPU Usage (%)"
+    )
+
+    plot_scatter_metrics(
+        report_df,
+        "Original Size (bytes)",
+        ["CPU Compression (%)", "CPU Decompression (%)"],
+        ["CPU Compression", "CPU Decompression"],
+        "CPU Usage vs Original File Size",
+        "Original File Size (bytes)",
+        "CPU Usage (%)"
+    )
+
+    plot_boxplot_metrics(
+        report_df,
+        "File Extension",
+        "Compressed Size (bytes)",
+        "Distribution of Compressed File Sizes by File Extension",
+        "File Extension",
+        "Compressed Size (bytes)"
+    )
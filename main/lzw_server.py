@@ -0,0 +1,273 @@
+import sys
+import os
+import time
+import signal
+import socket
+import asyncio
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from struct import Struct
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from LZW.lzw_encoder import LZWEncoder
+from LZW.dictionary_policy import FREEZE, POLICIES
+from utils.utils import compress_bytes, decompress_bytes
+from utils.report_manager import ReportManager
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_MAX_PENDING = 64  # Requisições aguardando ou em execução no pool, somando todas as conexões
+DEFAULT_MAX_REQUEST_SIZE = 64 << 20  # Maior conteúdo aceito em uma requisição (64 MiB)
+DEFAULT_TIMEOUT = 60.0  # Segundos que uma requisição pode ocupar o pool antes de ser respondida com erro
+DEFAULT_SHUTDOWN_GRACE = 10.0  # Segundos que as requisições em andamento têm para terminar no encerramento
+
+# Protocolo: cada mensagem é um cabeçalho de tamanho fixo seguido do conteúdo
+_REQUEST = Struct(">BBBI")  # Operação, max_bits, política de tabela cheia, tamanho do conteúdo
+_RESPONSE = Struct(">BI")  # Situação, tamanho do conteúdo (o resultado ou a mensagem de erro em UTF-8)
+
+OP_COMPRESS = 1  # Conteúdo: bytes originais; resposta: arquivo .lzw completo (cabeçalho e códigos)
+OP_DECOMPRESS = 2  # Conteúdo: arquivo .lzw completo; resposta: bytes originais (max_bits e política são ignorados)
+OPERATIONS = {OP_COMPRESS: "compress", OP_DECOMPRESS: "decompress"}
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+
+# ----------------- Trabalho nos Processos do Pool -----------------
+_encoders = {}  # LZWEncoder por (max_bits, política), reaproveitado pelas requisições do mesmo processo
+
+
+def compress_request(data, max_bits, policy):
+    """Comprime bytes com o codificador aquecido do processo; executada nos processos do pool."""
+    encoder = _encoders.get((max_bits, policy))
+    if encoder is None:
+        encoder = _encoders[(max_bits, policy)] = LZWEncoder(max_bits, policy=policy)
+    return compress_bytes(data, encoder=encoder)
+
+
+# ----------------- Servidor -----------------
+class LZWServer:
+    """Serviço de compressão asyncio em um socket local (Unix ou TCP em localhost).
+
+    O laço de eventos só lê e escreve mensagens; a compressão e a descompressão rodam em
+    um pool de processos cujos codificadores ficam aquecidos entre as requisições. Cada
+    conexão atende uma requisição por vez, e no máximo ``max_pending`` requisições de todas
+    as conexões ficam na fila do pool: as demais esperam uma vaga sem que a conexão leia a
+    próxima mensagem, o que propaga a contrapressão até o cliente pelo próprio socket. A vaga
+    de uma requisição só é devolvida quando o processo do pool termina o trabalho, mesmo que
+    ela já tenha sido respondida com erro por exceder ``timeout``.
+    """
+
+    def __init__(self, workers=None, max_pending=DEFAULT_MAX_PENDING, max_request_size=DEFAULT_MAX_REQUEST_SIZE,
+                 verbose=False, timeout=DEFAULT_TIMEOUT, shutdown_grace=DEFAULT_SHUTDOWN_GRACE):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_request_size = max_request_size
+        self.timeout = timeout  # Segundos por requisição no pool (None: sem limite)
+        self.shutdown_grace = shutdown_grace  # Segundos para as requisições em andamento terminarem no encerramento
+        self.verbose = verbose  # Exibe uma linha por requisição
+        self.report_manager = ReportManager()
+        self._executor = None
+        self._slots = None
+        self._connections = {}  # Tarefa que atende cada conexão aberta, por writer
+        self._busy = set()  # Writers das conexões com uma requisição em andamento
+        self._stopping = False
+
+    async def serve(self, unix_path=None, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Atende conexões até receber SIGINT ou SIGTERM; usa o socket Unix ``unix_path`` se informado, senão TCP."""
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signal_number, stop.set)
+
+        self._slots = asyncio.Semaphore(self.max_pending)
+        with ProcessPoolExecutor(max_workers=self.workers) as self._executor:
+            if unix_path is not None:
+                server = await asyncio.start_unix_server(self.handle_connection, unix_path)
+            else:
+                server = await asyncio.start_server(self.handle_connection, host, port)
+            print(f"Servidor LZW ouvindo em {unix_path or f'{host}:{port}'}")
+            async with server:
+                await stop.wait()
+                await self._drain_connections(server)
+
+    async def _drain_connections(self, server):
+        """Fecha as conexões ociosas e dá ``shutdown_grace`` segundos para as requisições em andamento.
+
+        Uma conexão com requisição em andamento é fechada logo após enviar a resposta; as que
+        ainda não responderam ao fim do prazo são canceladas.
+        """
+        self._stopping = True
+        server.close()
+        for writer in list(self._connections):
+            if writer not in self._busy:
+                writer.transport.close()
+        tasks = list(self._connections.values())
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=self.shutdown_grace)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def handle_connection(self, reader, writer):
+        """Lê requisições da conexão até o cliente fechá-la, respondendo cada uma na ordem."""
+        self._connections[writer] = asyncio.current_task()
+        try:
+            while not self._stopping:
+                try:
+                    header = await reader.readexactly(_REQUEST.size)
+                except asyncio.IncompleteReadError:
+                    break  # O cliente fechou a conexão
+                self._busy.add(writer)
+                operation, max_bits, policy, size = _REQUEST.unpack(header)
+                if size > self.max_request_size:
+                    # O conteúdo não é lido, então a conexão não pode continuar sincronizada
+                    message = f"Requisição com {size} bytes excede o limite de {self.max_request_size} bytes."
+                    await self._respond(writer, STATUS_ERROR, message.encode())
+                    break
+                payload = await reader.readexactly(size)
+                status, result = await self._process(operation, max_bits, policy, payload)
+                await self._respond(writer, status, result)
+                self._busy.discard(writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # Conexão interrompida no meio de uma mensagem
+        finally:
+            del self._connections[writer]
+            self._busy.discard(writer)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _process(self, operation, max_bits, policy, payload):
+        """Espera uma vaga, executa a operação no pool e registra os tempos. Retorna (situação, conteúdo)."""
+        loop = asyncio.get_running_loop()
+        queued = time.perf_counter()
+        await self._slots.acquire()
+        started = time.perf_counter()
+        error = None
+        work = None
+        try:
+            if operation == OP_COMPRESS:
+                if policy >= len(POLICIES):
+                    raise ValueError(f"Política de tabela cheia desconhecida: {policy}.")
+                work = loop.run_in_executor(self._executor, compress_request, payload, max_bits, POLICIES[policy])
+            elif operation == OP_DECOMPRESS:
+                work = loop.run_in_executor(self._executor, decompress_bytes, payload)
+            else:
+                raise ValueError(f"Operação desconhecida: {operation}.")
+            # A vaga fica ocupada até o processo do pool terminar, mesmo com o tempo esgotado
+            work.add_done_callback(self._release_slot)
+            result = await asyncio.wait_for(asyncio.shield(work), self.timeout)
+        except asyncio.TimeoutError:
+            error = f"A requisição excedeu o limite de {self.timeout} segundos."
+            result = error.encode()
+        except Exception as exception:
+            # Qualquer falha no pool (inclusive de um conteúdo malformado) vira uma resposta de erro
+            error = str(exception) or type(exception).__name__
+            result = error.encode()
+        finally:
+            if work is None:
+                self._slots.release()  # Requisição recusada antes de chegar ao pool
+        finished = time.perf_counter()
+
+        self.report_manager.record_request(OPERATIONS.get(operation, str(operation)), len(payload), len(result),
+                                           started - queued, finished - started, error, self.verbose)
+        return (STATUS_OK if error is None else STATUS_ERROR), result
+
+    def _release_slot(self, work):
+        """Devolve a vaga de uma requisição quando o processo do pool termina o trabalho."""
+        self._slots.release()
+        if not work.cancelled():
+            work.exception()  # Marca como lida a falha de um trabalho que já foi respondido por tempo esgotado
+
+    @staticmethod
+    async def _respond(writer, status, result):
+        """Envia uma resposta e espera o buffer de escrita esvaziar (contrapressão de um cliente lento)."""
+        writer.write(_RESPONSE.pack(status, len(result)))
+        writer.write(result)
+        await writer.drain()
+
+
+# ----------------- Cliente -----------------
+class LZWClient:
+    """Cliente síncrono do servidor, para uso por outros processos locais."""
+
+    def __init__(self, unix_path=None, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        if unix_path is not None:
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.connect(unix_path)
+        else:
+            self.socket = socket.create_connection((host, port))
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def compress(self, data, max_bits=12, policy=FREEZE):
+        """Comprime bytes no servidor e retorna o conteúdo completo de um arquivo .lzw."""
+        return self._request(OP_COMPRESS, max_bits, POLICIES.index(policy), data)
+
+    def decompress(self, compressed):
+        """Descomprime no servidor o conteúdo de um arquivo .lzw."""
+        return self._request(OP_DECOMPRESS, 0, 0, compressed)
+
+    def _request(self, operation, max_bits, policy, payload):
+        """Envia uma requisição e espera a resposta; um erro do servidor vira ValueError."""
+        self.socket.sendall(_REQUEST.pack(operation, max_bits, policy, len(payload)))
+        self.socket.sendall(payload)
+        status, size = _RESPONSE.unpack(self._receive(_RESPONSE.size))
+        result = self._receive(size)
+        if status != STATUS_OK:
+            raise ValueError(result.decode())
+        return result
+
+    def _receive(self, size):
+        """Lê exatamente ``size`` bytes do socket."""
+        buffer = bytearray(size)
+        view = memoryview(buffer)
+        received = 0
+        while received < size:
+            count = self.socket.recv_into(view[received:])
+            if not count:
+                raise ConnectionError("O servidor fechou a conexão.")
+            received += count
+        return bytes(buffer)
+
+    def close(self):
+        """Fecha a conexão com o servidor."""
+        self.socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def parse_args(argv=None):
+    """Lê as opções da linha de comando."""
+    parser = argparse.ArgumentParser(description="Serviço de compressão LZW em um socket local.")
+    parser.add_argument("--unix", help="Caminho do socket Unix (padrão: TCP em --host/--port)")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, help="Processos do pool (padrão: número de núcleos)")
+    parser.add_argument("--max-pending", type=int, default=DEFAULT_MAX_PENDING,
+                        help="Requisições aguardando ou em execução no pool, somando todas as conexões")
+    parser.add_argument("--max-request-size", type=int, default=DEFAULT_MAX_REQUEST_SIZE, help="Em bytes")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help="Segundos que cada requisição pode levar no pool (0: sem limite)")
+    parser.add_argument("--shutdown-grace", type=float, default=DEFAULT_SHUTDOWN_GRACE,
+                        help="Segundos para as requisições em andamento terminarem ao receber SIGINT ou SIGTERM")
+    parser.add_argument("--verbose", action="store_true", help="Exibe o tempo de cada requisição")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    lzw_server = LZWServer(args.workers, args.max_pending, args.max_request_size, args.verbose, args.timeout or None,
+                           args.shutdown_grace)
+    try:
+        asyncio.run(lzw_server.serve(args.unix, args.host, args.port))
+    finally:
+        lzw_server.report_manager.log_server_report()
+        if args.unix is not None and os.path.exists(args.unix):
+            os.remove(args.unix)
@@ -4,55 +4,358 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from LZW.lzw_encoder import LZWEncoder
 from LZW.lzw_decoder import LZWDecoder
-from utils.utils import read_file, read_compressed_file, write_file, write_compressed_file
+from LZW.bit_stream import MAX_CODE_BITS, MIN_CODE_BITS, validate_max_bits
+from LZW.container import ContentChecksum, content_checksum, verify_content
+from LZW.dictionary_policy import FREEZE
+from LZW.parallel import ordered_map
+from LZW.preset_dictionary import DEFAULT_PRESET_ENTRIES, PresetDictionary, resolve_preset, train_preset
+from LZW.block_container import (
+    DEFAULT_BLOCK_SIZE,
+    read_block_header,
+    read_block_index,
+    read_block_payloads,
+    write_block_container,
+)
+from utils.utils import (
+    CHUNK_SIZE,
+    expand_inputs,
+    read_file,
+    read_file_chunks,
+    read_compressed_file,
+    read_compressed_header,
+    read_compressed_chunks,
+    write_file,
+    write_compressed_file,
+    write_compressed_stream,
+)
 from utils.report_manager import ReportManager
+from utils.compression_cache import DEFAULT_CACHE_SIZE, CompressionCache
+
+AUTO_MAX_BITS = 16  # Maior largura considerada quando max_bits é "auto"
+
+
+def compress_chunks(compressor, chunks):
+    """Gerador que comprime os blocos de entrada um a um, produzindo os códigos assim que ficam prontos."""
+    for chunk in chunks:
+        yield compressor.feed(chunk)
+    yield compressor.flush()
+
+
+def decompress_chunks(decompressor, code_chunks):
+    """Gerador que descomprime os blocos de códigos um a um, produzindo os bytes correspondentes."""
+    for codes in code_chunks:
+        yield decompressor.feed(codes)
+    yield decompressor.flush()
+
+
+def parse_max_bits(value):
+    """Converte o max_bits da linha de comando; encerra com uma mensagem se o valor estiver fora da faixa."""
+    try:
+        return validate_max_bits(int(value))
+    except ValueError:
+        print(f"max_bits inválido: {value}. Use um inteiro entre {MIN_CODE_BITS} e {MAX_CODE_BITS} ou \"auto\".")
+        sys.exit(1)
+
+
+_batch_app = None  # LZWApp de cada processo do pool de um lote, reaproveitado por todos os arquivos dele
+
+
+def _start_batch_worker(max_bits, policy, auto_width, preset):
+    """Cria o LZWApp do processo uma única vez, antes do primeiro arquivo do lote."""
+    global _batch_app
+    _batch_app = LZWApp(max_bits, policy, auto_width, preset=preset)
+
+
+def _run_batch_job(job):
+    """Comprime ou descomprime um arquivo do lote; executada nos processos do pool.
+
+    Retorna (arquivo, tamanho de entrada, tamanho de saída, erro); qualquer erro fica restrito
+    ao arquivo e não interrompe o lote.
+    """
+    action, input_path, output_path = job
+    try:
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        if action == "compress":
+            input_size, output_size = _batch_app._compress_file(input_path, output_path)
+        else:
+            input_size, output_size = _batch_app._decompress_file(input_path, output_path)
+    except Exception as error:
+        return input_path, None, None, str(error) or type(error).__name__
+    return input_path, input_size, output_size, None
+
 
 class LZWApp:
     """Classe principal que gerencia o fluxo de compressão e descompressão."""
 
-    def __init__(self, max_bits=12):
-        self.encoder = LZWEncoder(max_bits)
-        self.decoder = LZWDecoder(max_bits)
-        self.report_manager = ReportManager()
+    def __init__(self, max_bits=12, policy=FREEZE, auto_width=False, collect_stats=False, profile=False, preset=None,
+                 cache=None):
+        self.report_manager = ReportManager(collect_stats, profile)
+        self.preset = preset  # PresetDictionary opcional, usado na compressão e exigido pelos arquivos que o referenciam
+        self.cache = cache  # CompressionCache opcional na frente de compress_file e decompress_file
+        self.report_manager.cache = cache
+        self.encoder = LZWEncoder(max_bits, policy=policy, auto_width=auto_width, stats=self.report_manager.stats,
+                                  preset=preset, verbose=True)
+        self.decoder = LZWDecoder(max_bits, policy=policy, stats=self.report_manager.stats)
+
+    def train_preset(self, output_path, sample_paths, max_entries=DEFAULT_PRESET_ENTRIES):
+        """Treina um dicionário pré-definido com os arquivos de exemplo e o grava em ``output_path``."""
+        self.report_manager.start_timer()
+        preset = train_preset((read_file(path) for path in sample_paths), max_entries)
+        self.report_manager.stop_timer()
+        preset.save(output_path)
+        print(f"Dicionário pré-definido {preset.id:08x} com {len(preset)} entradas salvo em: {output_path}")
+        return preset
 
     def compress_file(self, input_path, output_path):
         """Executa a compressão de um arquivo."""
-        data = read_file(input_path)
+        self.report_manager.calculate_compression_ratio(*self._compress_file(input_path, output_path))
+        self.report_manager.log_report()
+
+    def _compress_file(self, input_path, output_path):
+        """Comprime um arquivo sem exibir o relatório e retorna (tamanho original, tamanho comprimido)."""
+        with self.report_manager.phase("read"):
+            data = read_file(input_path)
+        if self.cache is not None:
+            key = self.cache.key(data, "compress", self.encoder.initial_max_bits, self.encoder.policy,
+                                 self.encoder.auto_width, self.preset.id if self.preset is not None else 0)
+            if self._write_cached(key, output_path):
+                return len(data), os.path.getsize(output_path)
         self.report_manager.start_timer()
-        compressed_data = self.encoder.compress(data)
+        with self.report_manager.phase("encode"):
+            compressed_data = self.encoder.compress(data)
         self.report_manager.stop_timer()
-        self.report_manager.calculate_compression_ratio(len(data), len(compressed_data))
-        write_compressed_file(output_path, compressed_data)
-        self.report_manager.log_report()
+        with self.report_manager.phase("write"):
+            write_compressed_file(output_path, compressed_data, self.encoder.max_bits, self.encoder.policy, self.preset,
+                                  len(data), content_checksum(data))
+        if self.cache is not None:
+            self.cache.put(key, read_file(output_path))
+        return len(data), os.path.getsize(output_path)
 
     def decompress_file(self, input_path, output_path):
         """Executa a descompressão de um arquivo."""
-        compressed_data = read_compressed_file(input_path)
+        self.report_manager.calculate_decompression_ratio(*self._decompress_file(input_path, output_path))
+        self.report_manager.log_report(process_type="decompression")
+
+    def _decompress_file(self, input_path, output_path):
+        """Descomprime um arquivo sem exibir o relatório e retorna (tamanho comprimido, tamanho descomprimido)."""
+        if self.cache is not None:
+            # O ID do dicionário entra na chave para que um dicionário ausente ou errado continue sendo recusado
+            key = self.cache.key(read_file(input_path), "decompress", self.preset.id if self.preset is not None else 0)
+            if self._write_cached(key, output_path):
+                return os.path.getsize(input_path), os.path.getsize(output_path)
+        with self.report_manager.phase("read"):
+            compressed_data, header = read_compressed_file(input_path, self.preset)
+        preset = resolve_preset(header.preset_id, self.preset)
+        self.decoder = LZWDecoder(header.max_bits, policy=header.policy, stats=self.report_manager.stats, preset=preset)
+        self.report_manager.start_timer()
+        with self.report_manager.phase("decode"):
+            # O tamanho original do cabeçalho permite pré-alocar a saída exata
+            decompressed_data = self.decoder.decompress(compressed_data, header.original_size)
+        self.report_manager.stop_timer()
+        with self.report_manager.phase("verify"):
+            verify_content(header, len(decompressed_data), content_checksum(decompressed_data))
+        with self.report_manager.phase("write"):
+            write_file(output_path, decompressed_data)
+        if self.cache is not None:
+            self.cache.put(key, decompressed_data)
+        return os.path.getsize(input_path), len(decompressed_data)
+
+    def _write_cached(self, key, output_path):
+        """Grava em ``output_path`` o resultado em cache da chave, se houver; indica se houve acerto."""
         self.report_manager.start_timer()
-        decompressed_data = self.decoder.decompress(compressed_data)
+        with self.report_manager.phase("cache"):
+            cached = self.cache.get(key)
         self.report_manager.stop_timer()
-        self.report_manager.calculate_decompression_ratio(len(compressed_data), len(decompressed_data))
-        write_file(output_path, decompressed_data)
+        if cached is None:
+            return False
+        with self.report_manager.phase("write"):
+            write_file(output_path, cached)
+        return True
+
+    def compress_many(self, inputs, output_dir, workers=None):
+        """Comprime arquivos, diretórios e padrões glob para ``output_dir`` (``<nome>.lzw``) em um pool de processos.
+
+        Cada processo cria um LZWApp com esta configuração uma única vez e o reaproveita em
+        todos os arquivos que recebe, então a inicialização do interpretador, os imports e o
+        dicionário inicial são pagos por processo, e não por arquivo. Exibe o relatório
+        agregado do lote e retorna os resultados por arquivo.
+        """
+        jobs = [("compress", path, os.path.join(output_dir, name + ".lzw")) for path, name in expand_inputs(inputs)]
+        return self._run_batch(jobs, workers, "compression")
+
+    def decompress_many(self, inputs, output_dir, workers=None):
+        """Descomprime arquivos, diretórios e padrões glob para ``output_dir``, como em ``compress_many``.
+
+        O sufixo ``.lzw`` é removido do nome de saída (ou ``.out`` é acrescentado, se não houver).
+        """
+        jobs = [("decompress", path, os.path.join(output_dir, name[:-4] if name.endswith(".lzw") else name + ".out"))
+                for path, name in expand_inputs(inputs)]
+        return self._run_batch(jobs, workers, "decompression")
+
+    def _run_batch(self, jobs, workers, process_type):
+        """Executa os arquivos do lote no pool e registra cada resultado no relatório agregado."""
+        if self.report_manager.stats is not None or self.report_manager.profiler is not None:
+            # O trabalho roda nos LZWApp dos processos do pool, então os contadores deste ficariam vazios
+            raise ValueError("--stats e --profile não são suportados nos lotes (compress-many e decompress-many).")
+        settings = (self.encoder.initial_max_bits, self.encoder.policy, self.encoder.auto_width, self.preset)
+        self.report_manager.start_timer()
+        for result in ordered_map(_run_batch_job, jobs, workers, _start_batch_worker, settings):
+            self.report_manager.record_batch_file(*result)
+        self.report_manager.stop_timer()
+        self.report_manager.log_batch_report(process_type)
+        return self.report_manager.batch_results
+
+    def compress_file_stream(self, input_path, output_path, chunk_size=CHUNK_SIZE):
+        """Executa a compressão de um arquivo em streaming, com uso de memória constante."""
+        content = ContentChecksum()
+        code_chunks = compress_chunks(self.encoder.compressobj(), content.track(read_file_chunks(input_path, chunk_size)))
+        self.report_manager.start_timer()
+        write_compressed_stream(output_path, code_chunks, self.encoder.max_bits, self.encoder.policy, self.preset, content)
+        self.report_manager.stop_timer()
+        self.report_manager.calculate_compression_ratio(os.path.getsize(input_path), os.path.getsize(output_path))
+        self.report_manager.log_report()
+
+    def decompress_file_stream(self, input_path, output_path, chunk_size=CHUNK_SIZE):
+        """Executa a descompressão de um arquivo em streaming, com uso de memória constante."""
+        header = read_compressed_header(input_path)
+        preset = resolve_preset(header.preset_id, self.preset)
+        self.decoder = LZWDecoder(header.max_bits, policy=header.policy, stats=self.report_manager.stats, preset=preset)
+        content = ContentChecksum()
+        self.report_manager.start_timer()
+        with open(output_path, "wb") as file:
+            code_chunks = read_compressed_chunks(input_path, chunk_size, preset)
+            for data in content.track(decompress_chunks(self.decoder.decompressobj(), code_chunks)):
+                file.write(data)
+        self.report_manager.stop_timer()
+        # Conferido ao fim do fluxo, sem uma segunda leitura do arquivo de saída
+        verify_content(header, content.size, content.checksum)
+        self.report_manager.calculate_decompression_ratio(os.path.getsize(input_path), content.size)
+        self.report_manager.log_report(process_type="decompression")
+
+    def compress_file_blocks(self, input_path, output_path, block_size=DEFAULT_BLOCK_SIZE, workers=None, measure_loss=False):
+        """Executa a compressão em blocos independentes, em paralelo, com a tabela de blocos no rodapé.
+
+        Com ``measure_loss`` o arquivo também é comprimido como um único fluxo, apenas para
+        relatar a perda de taxa causada pelo dicionário novo em cada bloco.
+        """
+        self.report_manager.start_timer()
+        with open(output_path, "wb") as file:
+            payloads = self.encoder.compress_blocks(read_file_chunks(input_path, block_size), workers)
+            write_block_container(file, payloads, self.encoder.max_bits, self.encoder.policy, block_size)
+        self.report_manager.stop_timer()
+        original_size = os.path.getsize(input_path)
+        compressed_size = os.path.getsize(output_path)
+        self.report_manager.calculate_compression_ratio(original_size, compressed_size)
+        if measure_loss:
+            code_chunks = compress_chunks(self.encoder.compressobj(), read_file_chunks(input_path))
+            stream_size = write_compressed_stream(os.devnull, code_chunks, self.encoder.max_bits, self.encoder.policy)
+            self.report_manager.calculate_block_ratio_loss(original_size, compressed_size, stream_size)
+        self.report_manager.log_report()
+
+    def decompress_file_blocks(self, input_path, output_path, workers=None):
+        """Executa a descompressão paralela de um contêiner de blocos."""
+        decompressed_size = 0
+        with open(input_path, "rb") as file:
+            header = read_block_header(file)
+            entries = read_block_index(file)
+            self.decoder = LZWDecoder(header.max_bits, policy=header.policy)
+            self.report_manager.start_timer()
+            with open(output_path, "wb") as output:
+                for data in self.decoder.decompress_blocks(read_block_payloads(file, entries), workers):
+                    decompressed_size += output.write(data)
+            self.report_manager.stop_timer()
+        self.report_manager.calculate_decompression_ratio(os.path.getsize(input_path), decompressed_size)
+        self.report_manager.log_report(process_type="decompression")
+
+    def read_file_range(self, input_path, output_path, offset, length):
+        """Extrai um intervalo do conteúdo original de um contêiner de blocos, sem descomprimi-lo inteiro."""
+        self.report_manager.start_timer()
+        data = self.decoder.read_range(input_path, offset, length)
+        self.report_manager.stop_timer()
+        with open(output_path, "wb") as file:
+            file.write(data)
+        self.report_manager.calculate_decompression_ratio(os.path.getsize(input_path), len(data))
         self.report_manager.log_report(process_type="decompression")
 
 if __name__ == "__main__":
-    if len(sys.argv) < 4:
-        print("Uso: python main.py <compress|decompress> <input_file> <output_file> [max_bits]")
+    # Opções no formato --nome (ou --nome=valor) podem aparecer em qualquer posição
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    options = {arg for arg in sys.argv[1:] if arg.startswith("--")}
+    values = dict(option[2:].split("=", 1) for option in options if "=" in option)
+
+    if len(args) < 3:
+        print("Uso: python main.py <compress|decompress|compress-stream|decompress-stream|compress-blocks|decompress-blocks> "
+              "<input_file> <output_file> [max_bits|auto] [freeze|reset|adaptive] [--measure-loss] [--stats] [--profile] "
+              "[--preset=<dicionario.lzd>] [--cache=<diretório>] [--cache-size=BYTES]\n"
+              "     python main.py read-range <input_file> <output_file> <offset> <length>\n"
+              "     python main.py train-preset <dicionario.lzd> <amostra> [amostra ...] [--entries=N]\n"
+              "     python main.py <compress-many|decompress-many> <output_dir> <arquivo|diretório|glob> [...] "
+              "[--max-bits=N|auto] [--policy=freeze|reset|adaptive] [--workers=N] [--preset=<dicionario.lzd>]")
         sys.exit(1)
 
-    action = sys.argv[1]
-    input_file = sys.argv[2]
-    output_file = sys.argv[3]
+    action = args[0]
+    input_file = args[1]
+    output_file = args[2]
     
+    if action == "read-range":
+        LZWApp().read_file_range(input_file, output_file, int(args[3]), int(args[4]))
+        sys.exit(0)
+
+    if action == "train-preset":
+        # Aqui o primeiro argumento é o dicionário de saída e os demais são as amostras
+        LZWApp().train_preset(args[1], args[2:], int(values.get("entries", DEFAULT_PRESET_ENTRIES)))
+        sys.exit(0)
+
+    # Dicionário pré-definido treinado com train-preset (apenas arquivos inteiros e streaming)
+    preset = PresetDictionary.load(values["preset"]) if "preset" in values else None
+    if preset is not None and action.endswith("-blocks"):
+        print("O dicionário pré-definido não é suportado no contêiner de blocos.")
+        sys.exit(1)
+
+    if action in ("compress-many", "decompress-many"):
+        # Lotes: o primeiro argumento é o diretório de saída, os demais são as entradas; a
+        # configuração vem das opções, para não ser confundida com nomes de arquivos
+        if "--stats" in options or "--profile" in options:
+            print("--stats e --profile não são suportados em compress-many e decompress-many.")
+            sys.exit(1)
+        auto_width = values.get("max-bits") == "auto"
+        max_bits = AUTO_MAX_BITS if auto_width else parse_max_bits(values.get("max-bits", 12))
+        app = LZWApp(max_bits, values.get("policy", FREEZE), auto_width, preset=preset)
+        workers = int(values["workers"]) if "workers" in values else None
+        if action == "compress-many":
+            results = app.compress_many(args[2:], args[1], workers)
+        else:
+            results = app.decompress_many(args[2:], args[1], workers)
+        sys.exit(1 if any(error is not None for *_, error in results) else 0)
+
     # Define max_bits como 12 por padrão, mas permite que seja configurado como argumento opcional
-    max_bits = int(sys.argv[4]) if len(sys.argv) > 4 else 12
+    # Com "auto", max_bits é escolhido automaticamente entre 9 e AUTO_MAX_BITS em uma única passada
+    auto_width = len(args) > 3 and args[3] == "auto"
+    max_bits = AUTO_MAX_BITS if auto_width else parse_max_bits(args[3]) if len(args) > 3 else 12
+    # Política para quando a tabela enche (padrão: congelar o dicionário)
+    policy = args[4] if len(args) > 4 else FREEZE
+
+    # Cache em disco dos resultados de compress e decompress, reaproveitado entre execuções
+    cache = None
+    if "cache" in values:
+        cache = CompressionCache(int(values.get("cache-size", DEFAULT_CACHE_SIZE)), values["cache"])
 
     # Inicializa o aplicativo com o valor de max_bits
-    app = LZWApp(max_bits)
+    # --stats mostra os contadores internos; --profile roda o trecho cronometrado sob o cProfile
+    app = LZWApp(max_bits, policy, auto_width, "--stats" in options, "--profile" in options, preset, cache)
 
     if action == "compress":
         app.compress_file(input_file, output_file)
     elif action == "decompress":
         app.decompress_file(input_file, output_file)
+    elif action == "compress-stream":
+        app.compress_file_stream(input_file, output_file)
+    elif action == "decompress-stream":
+        app.decompress_file_stream(input_file, output_file)
+    elif action == "compress-blocks":
+        app.compress_file_blocks(input_file, output_file, measure_loss="--measure-loss" in options)
+    elif action == "decompress-blocks":
+        app.decompress_file_blocks(input_file, output_file)
     else:
-        print("Ação inválida! Use 'compress' ou 'decompress'.")
+        print("Ação inválida! Use 'compress', 'decompress', 'compress-stream', 'decompress-stream', "
+              "'compress-blocks', 'decompress-blocks', 'read-range', 'train-preset', 'compress-many' ou 'decompress-many'.")
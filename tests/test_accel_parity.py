@@ -0,0 +1,50 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+pytest.importorskip("LZW._lzw_accel", reason="módulo compilado ausente (python LZW/build_accel.py)")
+
+from LZW.bit_stream import STORED_MAX_BITS
+from LZW.dictionary_policy import POLICIES
+from LZW.lzw_decoder import LZWDecoder
+from LZW.lzw_encoder import LZWEncoder
+from LZW.stats import CodecStats
+
+TEST_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lzw_test_cases")
+TEST_FILES = sorted(name for name in os.listdir(TEST_DIR) if os.path.isfile(os.path.join(TEST_DIR, name)))
+
+
+def counters(stats):
+    return stats.lookups, stats.misses, stats.fill_point, stats.codes_per_width
+
+
+def encode(data, max_bits, policy, backend):
+    stats = CodecStats()
+    encoder = LZWEncoder(max_bits, backend=backend, policy=policy, stats=stats)
+    return encoder.max_bits, list(encoder.compress(data)), counters(stats)
+
+
+def decode(codes, max_bits, policy, backend, size):
+    stats = CodecStats()
+    data = LZWDecoder(max_bits, policy, backend=backend, stats=stats).decompress(codes, size)
+    return bytes(data), counters(stats)
+
+
+@pytest.mark.parametrize("max_bits", [9, 12])
+@pytest.mark.parametrize("policy", POLICIES)
+@pytest.mark.parametrize("name", TEST_FILES)
+def test_native_matches_python(name, policy, max_bits):
+    with open(os.path.join(TEST_DIR, name), "rb") as file:
+        data = file.read()
+    native = encode(data, max_bits, policy, "native")
+    assert native == encode(data, max_bits, policy, "dict")
+    assert native[:2] == encode(data, max_bits, policy, "trie")[:2]
+
+    used_bits, codes, _ = native
+    if used_bits == STORED_MAX_BITS:
+        return  # Armazenado sem compressão: não há códigos LZW a decodificar
+    decoded = decode(codes, used_bits, policy, "native", len(data))
+    assert decoded == decode(codes, used_bits, policy, "dict", len(data))
+    assert decoded[0] == data
@@ -0,0 +1,32 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from LZW.lzw_encoder import AUTO_SAMPLE_SIZE, BACKENDS, LZWEncoder, _lzw_accel
+from LZW.stats import CodecStats
+
+TEST_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lzw_test_cases")
+AVAILABLE_BACKENDS = [backend for backend in BACKENDS if backend != "native" or _lzw_accel is not None]
+
+
+def counters(stats):
+    return stats.lookups, stats.misses, stats.fill_point, stats.codes_per_width
+
+
+@pytest.mark.parametrize("backend", AVAILABLE_BACKENDS)
+@pytest.mark.parametrize("name, size", [("large_text.txt", None), ("large_image.bmp", AUTO_SAMPLE_SIZE - 1),
+                                        ("large_image.bmp", 3 * AUTO_SAMPLE_SIZE)])
+def test_auto_width_state_matches_chosen_width(backend, name, size):
+    with open(os.path.join(TEST_DIR, name), "rb") as file:
+        data = file.read()[:size]
+    auto_stats = CodecStats()
+    auto = LZWEncoder(16, backend=backend, auto_width=True, stats=auto_stats)
+    codes = auto.compress(data)
+
+    fixed_stats = CodecStats()
+    fixed = LZWEncoder(auto.max_bits, backend=backend, stats=fixed_stats)
+    assert list(codes) == list(fixed.compress(data))
+    assert auto.next_code == fixed.next_code
+    assert counters(auto_stats) == counters(fixed_stats)
@@ -0,0 +1,26 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from LZW.dictionary_policy import POLICIES
+from LZW.lzw_encoder import BACKENDS, LZWEncoder, _lzw_accel
+
+TEST_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lzw_test_cases")
+TEST_FILES = sorted(name for name in os.listdir(TEST_DIR) if os.path.isfile(os.path.join(TEST_DIR, name)))
+AVAILABLE_BACKENDS = [backend for backend in BACKENDS if backend != "native" or _lzw_accel is not None]
+
+
+@pytest.mark.parametrize("policy", POLICIES)
+@pytest.mark.parametrize("name", TEST_FILES)
+def test_backends_produce_identical_codes(name, policy):
+    with open(os.path.join(TEST_DIR, name), "rb") as file:
+        data = file.read()
+    streams = {}
+    for backend in AVAILABLE_BACKENDS:
+        encoder = LZWEncoder(12, backend=backend, policy=policy)
+        streams[backend] = (encoder.max_bits, list(encoder.compress(data)))
+    reference = streams["dict"]
+    for backend, stream in streams.items():
+        assert stream == reference, f"backend {backend!r} difere do \"dict\""
@@ -0,0 +1,73 @@
+import os
+import random
+import string
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from LZW.bit_stream import STORED_MAX_BITS, packed_size
+from LZW.compressibility import looks_incompressible
+from LZW.dictionary_policy import POLICIES
+from LZW.lzw_encoder import LZWEncoder
+from LZW.preset_dictionary import train_preset
+from utils.utils import compress_bytes
+
+PRINTABLE = string.printable[:95].encode()  # Letras, dígitos, pontuação e espaço
+
+
+def random_text(size, seed=7):
+    rng = random.Random(seed)
+    return bytes(rng.choice(PRINTABLE) for _ in range(size))
+
+
+@pytest.mark.parametrize("size", [500, 5000, 500000])
+def test_random_printable_text_is_incompressible(size):
+    assert looks_incompressible(random_text(size))
+
+
+def test_random_bytes_are_incompressible():
+    assert looks_incompressible(random.Random(3).randbytes(100000))
+
+
+@pytest.mark.parametrize("data", [
+    b"".join(b"linha %d: um texto comum, com palavras repetidas\n" % i for i in range(5000)),
+    random.Random(5).randbytes(50000).hex().encode(),  # Poucos símbolos distintos: o LZW ainda comprime
+])
+def test_compressible_input_is_kept(data):
+    assert not looks_incompressible(data)
+
+
+def test_encoder_stores_random_text_without_full_passes(capsys):
+    data = random_text(200000)
+    encoder = LZWEncoder(12, verbose=True)
+    assert encoder.compress(data) == data
+    assert encoder.max_bits == STORED_MAX_BITS
+    assert "incompressível" in capsys.readouterr().out
+
+
+def test_encoder_is_silent_unless_verbose(capsys):
+    encoder = LZWEncoder(12)
+    assert encoder.compress(random_text(20000)) == random_text(20000)
+    assert encoder.compress(b"abc") == b"abc"
+    assert capsys.readouterr().out == ""
+
+
+def test_compress_bytes_is_silent_on_stored_inputs(capsys):
+    compress_bytes(random.Random(5).randbytes(50000))  # A função medida pelo benchmark
+    assert capsys.readouterr().out == ""
+
+
+def http_request(index):
+    return f"GET /api/v1/users/{index}/orders?page={index % 7} HTTP/1.1\r\n".encode()
+
+
+@pytest.mark.parametrize("policy", POLICIES)
+def test_small_input_compresses_with_a_preset(policy):
+    preset = train_preset([http_request(index) for index in range(200)])
+    data = http_request(12345)
+    assert LZWEncoder(12, policy=policy).compress(data) == data  # Sem o dicionário, não há o que comprimir
+    encoder = LZWEncoder(12, policy=policy, preset=preset)
+    codes = encoder.compress(data)
+    assert encoder.max_bits == 12
+    assert packed_size(codes, 12, encoder.first_code) < len(data) // 2
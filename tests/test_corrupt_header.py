@@ -0,0 +1,65 @@
+import os
+import random
+import sys
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from LZW.bit_stream import pack_codes, unpack_codes
+from LZW.container import pack_header, unpack_header
+from LZW.lzw_decoder import BACKENDS, PREALLOCATION_LIMIT, LZWDecoder, np, _lzw_accel
+from LZW.lzw_encoder import LZWEncoder
+from utils.utils import compress_bytes, decompress_bytes
+
+AVAILABLE_BACKENDS = [backend for backend in BACKENDS
+                      if (backend != "numpy" or np is not None) and (backend != "native" or _lzw_accel is not None)]
+
+DATA = b"um texto curto, repetido algumas vezes. " * 40
+
+
+def compressed_codes():
+    encoder = LZWEncoder(12)
+    return unpack_codes(pack_codes(list(encoder.compress(DATA)), 12), 12)
+
+
+def test_unpack_header_rejects_implausible_size():
+    with pytest.raises(ValueError):
+        unpack_header(pack_header(12, original_size=1 << 50))
+
+
+@pytest.mark.parametrize("max_bits", [0, 5, 64])
+def test_unpack_header_rejects_out_of_range_width(max_bits):
+    header = bytearray(pack_header(12, original_size=len(DATA)))
+    header[4] = max_bits
+    with pytest.raises(ValueError):
+        unpack_header(bytes(header))
+
+
+@pytest.mark.parametrize("backend", AVAILABLE_BACKENDS)
+def test_corrupt_size_is_a_hint_or_an_error(backend):
+    codes = compressed_codes()
+    decoder = LZWDecoder(12, backend=backend)
+    assert bytes(decoder.decompress(codes, len(DATA))) == DATA
+    try:
+        output = decoder.decompress(codes, 1 << 40)
+    except ValueError:
+        return
+    assert bytes(output) == DATA  # Backends que só usam o tamanho como dica de pré-alocação
+
+
+@pytest.mark.parametrize("backend", AVAILABLE_BACKENDS)
+def test_large_corrupt_size_is_not_preallocated(backend):
+    data = random.Random(20).randbytes(1 << 17).hex().encode()  # Muitos códigos: o limite pelos códigos fica alto
+    corrupt = bytearray(compress_bytes(data))
+    corrupt_size = 1 << 28
+    assert LZWDecoder(12)._max_output_size(len(corrupt) * 8 // 12) > corrupt_size > PREALLOCATION_LIMIT
+    corrupt[10:18] = corrupt_size.to_bytes(8, "big")
+    tracemalloc.start()
+    try:
+        with pytest.raises(ValueError):
+            decompress_bytes(bytes(corrupt), backend=backend)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < corrupt_size // 2
@@ -0,0 +1,29 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from LZW.dictionary_policy import POLICIES
+from LZW.lzw_decoder import BACKENDS, LZWDecoder, _lzw_accel, np
+from LZW.lzw_encoder import LZWEncoder
+
+TEST_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lzw_test_cases")
+TEST_FILES = sorted(name for name in os.listdir(TEST_DIR) if os.path.isfile(os.path.join(TEST_DIR, name)))
+AVAILABLE_BACKENDS = [backend for backend in BACKENDS
+                      if (backend != "numpy" or np is not None) and (backend != "native" or _lzw_accel is not None)]
+
+
+@pytest.mark.parametrize("max_bits", [9, 12])
+@pytest.mark.parametrize("policy", POLICIES)
+def test_decoder_backends_round_trip_like_dict(policy, max_bits):
+    for name in TEST_FILES:
+        with open(os.path.join(TEST_DIR, name), "rb") as file:
+            data = file.read()
+        encoder = LZWEncoder(max_bits, backend="dict", policy=policy)
+        codes = list(encoder.compress(data))
+        expected = LZWDecoder(encoder.max_bits, policy, backend="dict").decompress(codes)
+        assert expected == data, name
+        for backend in AVAILABLE_BACKENDS:
+            output = LZWDecoder(encoder.max_bits, policy, backend=backend).decompress(codes, len(data))
+            assert bytes(output) == expected, f"{name}: backend {backend!r}"
@@ -0,0 +1,67 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from LZW.dictionary_policy import POLICIES
+from LZW.lzw_encoder import LZWEncoder
+from LZW.preset_dictionary import PresetDictionary, train_preset
+from main.main import LZWApp
+from utils.utils import compress_bytes, decompress_bytes, read_file, write_file
+
+
+def http_request(index):
+    return f"GET /api/v1/users/{index}/orders?page={index % 7} HTTP/1.1\r\nHost: example.com\r\n\r\n".encode()
+
+
+@pytest.fixture(scope="module")
+def preset():
+    return train_preset([http_request(index) for index in range(300)])
+
+
+def test_save_and_load_round_trip(preset, tmp_path):
+    path = tmp_path / "http.lzd"
+    preset.save(path)
+    loaded = PresetDictionary.load(path)
+    assert loaded.entries == preset.entries
+    assert loaded.id == preset.id
+    assert loaded.encoder_table(257, len(loaded)) == preset.encoder_table(257, len(preset))
+
+
+def test_load_rejects_truncated_file(preset, tmp_path):
+    path = tmp_path / "http.lzd"
+    path.write_bytes(preset.to_bytes()[:-1])
+    with pytest.raises(ValueError):
+        PresetDictionary.load(path)
+
+
+def test_decompress_requires_the_same_preset(preset):
+    compressed = compress_bytes(http_request(999), encoder=LZWEncoder(12, preset=preset))
+    assert decompress_bytes(compressed, preset=preset) == http_request(999)
+    with pytest.raises(ValueError, match="informe-o"):
+        decompress_bytes(compressed)
+    other = train_preset([b"SELECT id, name FROM users WHERE id = %d;" % index for index in range(50)])
+    with pytest.raises(ValueError, match="incorreto"):
+        decompress_bytes(compressed, preset=other)
+
+
+@pytest.mark.parametrize("policy", POLICIES)
+@pytest.mark.parametrize("stream", [False, True], ids=["file", "stream"])
+def test_round_trip_with_preset(preset, policy, stream, tmp_path):
+    data = b"".join(http_request(index) for index in range(1000, 1300))
+    input_path, compressed_path, output_path = (str(tmp_path / name) for name in ("in", "in.lzw", "out"))
+    write_file(input_path, data)
+
+    app = LZWApp(12, policy=policy, preset=preset)
+    if stream:
+        app.compress_file_stream(input_path, compressed_path, chunk_size=4093)
+        app.decompress_file_stream(compressed_path, output_path, chunk_size=4093)
+    else:
+        app.compress_file(input_path, compressed_path)
+        app.decompress_file(compressed_path, output_path)
+    assert read_file(output_path) == data
+    assert len(read_file(compressed_path)) < len(compress_bytes(data, 12, policy))
+
+    with pytest.raises(ValueError):
+        LZWApp(12, policy=policy).decompress_file(compressed_path, output_path)
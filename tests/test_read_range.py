@@ -0,0 +1,35 @@
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from LZW.block_container import write_block_container
+from LZW.lzw_decoder import LZWDecoder
+from LZW.lzw_encoder import LZWEncoder
+
+BLOCK_SIZE = 1 << 12
+
+
+@pytest.fixture
+def container(tmp_path):
+    """Contêiner de blocos com um texto de algumas dezenas de KiB; retorna (caminho, conteúdo original)."""
+    data = b"".join(b"linha %d do arquivo de teste\n" % i for i in range(2000))
+    path = tmp_path / "texto.lzb"
+    blocks = [data[start:start + BLOCK_SIZE] for start in range(0, len(data), BLOCK_SIZE)]
+    with open(path, "wb") as file:
+        write_block_container(file, LZWEncoder(12).compress_blocks(blocks, workers=1), 12, block_size=BLOCK_SIZE)
+    return path, data
+
+
+@pytest.mark.parametrize("offset, length", [(0, 100), (BLOCK_SIZE - 10, 30), (5000, 20000), (50000, 100)])
+def test_read_range_matches_content(container, offset, length):
+    path, data = container
+    assert LZWDecoder().read_range(path, offset, length) == data[offset:offset + length]
+
+
+@pytest.mark.parametrize("offset, length", [(-5, 10), (10, -1)])
+def test_read_range_rejects_negative_values(container, offset, length):
+    path, _ = container
+    with pytest.raises(ValueError):
+        LZWDecoder().read_range(path, offset, length)
@@ -0,0 +1,38 @@
+import os
+import random
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from LZW.dictionary_policy import POLICIES
+from LZW.lzw_encoder import BACKENDS, LZWEncoder, _lzw_accel
+from LZW.stats import CodecStats
+
+AVAILABLE_BACKENDS = [backend for backend in BACKENDS if backend != "native" or _lzw_accel is not None]
+
+
+def sample_data():
+    """Texto repetitivo com um trecho aleatório no meio, para encher a tabela e provocar reinícios."""
+    rng = random.Random(13)
+    text = b"".join(b"registro %d: valor=%d status=ok\n" % (i, rng.randrange(100)) for i in range(3000))
+    return text + bytes(rng.randrange(256) for _ in range(20000)) + text
+
+
+@pytest.mark.parametrize("policy", POLICIES)
+@pytest.mark.parametrize("max_bits", [9, 12])
+def test_encoder_backends_report_equal_counters(policy, max_bits):
+    data = sample_data()
+    counters = {}
+    for backend in AVAILABLE_BACKENDS:
+        stats = CodecStats()
+        codes = LZWEncoder(max_bits, backend=backend, policy=policy, stats=stats).compress(data)
+        counters[backend] = (list(codes), stats.passes, stats.lookups, stats.misses, stats.fill_point,
+                             stats.codes_per_width)
+    assert len(set(map(repr, counters.values()))) == 1, {backend: value[1:] for backend, value in counters.items()}
+
+
+def test_lookups_skip_only_the_first_byte():
+    stats = CodecStats()
+    LZWEncoder(12, backend="trie", stats=stats).compress(b"abababababab" * 50)
+    assert stats.lookups == 12 * 50 - 1
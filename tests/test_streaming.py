@@ -0,0 +1,58 @@
+import os
+import random
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from LZW.dictionary_policy import POLICIES
+from LZW.lzw_decoder import LZWDecoder
+from LZW.lzw_encoder import LZWCompressor, _lzw_accel
+
+ENCODER_BACKENDS = ["dict"] + (["native"] if _lzw_accel is not None else [])
+MAX_BITS = 9  # Tabela pequena: enche logo e exercita o congelamento, o CLEAR e os reinícios adaptativos
+
+
+def sample_data():
+    """Texto com trechos aleatórios, maior que algumas janelas da política adaptativa."""
+    rng = random.Random(11)
+    parts = []
+    for i in range(12):
+        parts.append(b"".join(b"evento %d: usuario=%d acao=login\n" % (i, rng.randrange(50)) for _ in range(120)))
+        parts.append(rng.randbytes(1500))
+    return b"".join(parts)
+
+
+def feed_in_chunks(stream, data, chunk_size):
+    """Alimenta o objeto incremental em blocos de ``chunk_size`` e junta a saída, incluindo o ``flush``."""
+    output = []
+    for start in range(0, len(data), chunk_size):
+        output.append(stream.feed(data[start:start + chunk_size]))
+    output.append(stream.flush())
+    return output
+
+
+def one_shot_codes(data, policy, backend):
+    compressor = LZWCompressor(MAX_BITS, policy, backend=backend)
+    return compressor.feed(data) + compressor.flush()
+
+
+@pytest.mark.parametrize("backend", ENCODER_BACKENDS)
+@pytest.mark.parametrize("policy", POLICIES)
+@pytest.mark.parametrize("chunk_size", [1, 7, 4093, None])
+def test_chunked_compression_matches_one_shot(chunk_size, policy, backend):
+    data = sample_data()
+    expected = one_shot_codes(data, policy, backend)
+    chunks = feed_in_chunks(LZWCompressor(MAX_BITS, policy, backend=backend), data, chunk_size or len(data))
+    assert [code for codes in chunks for code in codes] == expected
+
+
+@pytest.mark.parametrize("policy", POLICIES)
+@pytest.mark.parametrize("chunk_size", [1, 7, 4093, None])
+def test_chunked_decompression_matches_one_shot(chunk_size, policy):
+    data = sample_data()
+    codes = one_shot_codes(data, policy, "dict")
+    decoder = LZWDecoder(MAX_BITS, policy, backend="dict")
+    assert decoder.decompress(codes) == data
+    chunks = feed_in_chunks(decoder.decompressobj(), codes, chunk_size or len(codes))
+    assert b"".join(chunks) == data
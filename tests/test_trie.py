@@ -0,0 +1,105 @@
+import os
+import random
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from LZW.trie import Trie
+
+
+def random_keys(count, seed=3):
+    """Chaves binárias com prefixos em comum, para forçar divisões de arestas."""
+    rng = random.Random(seed)
+    return {"".join(rng.choice("01") for _ in range(rng.randrange(1, 24))) for _ in range(count)}
+
+
+def build(keys):
+    trie = Trie()
+    for code, key in enumerate(sorted(keys)):
+        trie.insert(key, code)
+    return trie
+
+
+def test_search_finds_inserted_keys_only():
+    keys = random_keys(500)
+    trie = build(keys)
+    for code, key in enumerate(sorted(keys)):
+        assert trie.search(key) == code
+    for key in random_keys(500, seed=4) - keys:
+        assert trie.search(key) is None
+
+
+def test_insert_splits_edges_and_keeps_existing_codes():
+    trie = Trie()
+    trie.insert("0101", 1)
+    trie.insert("0110", 2)  # Diverge no meio da aresta "0101"
+    trie.insert("01", 3)  # Termina exatamente no nó criado pela divisão
+    assert (trie.search("0101"), trie.search("0110"), trie.search("01")) == (1, 2, 3)
+    assert trie.search("0") is None and trie.search("011") is None
+    assert sorted(node.value[0] for node in trie.root.children.values()) == ["0"]
+
+
+def test_starts_with_stops_in_the_middle_of_an_edge():
+    trie = build({"00110", "0111"})
+    assert trie.starts_with("")
+    assert trie.starts_with("001")  # Termina no meio da aresta "110"
+    assert trie.starts_with("0111")
+    assert not trie.starts_with("0010")
+    assert not trie.starts_with("01111")
+
+
+def test_delete_removes_keys_and_merges_edges():
+    keys = random_keys(300)
+    trie = build(keys)
+    codes = {key: code for code, key in enumerate(sorted(keys))}
+    removed = set(sorted(keys)[::3])
+    for key in removed:
+        assert trie.delete(key)
+        assert not trie.delete(key)
+    for key in keys:
+        assert trie.search(key) == (None if key in removed else codes[key])
+
+    # As arestas são fundidas: nenhum nó sem código fica com um único filho
+    pending = list(trie.root.children.values())
+    while pending:
+        node = pending.pop()
+        assert node.code is not None or len(node.children) != 1
+        pending.extend(node.children.values())
+
+
+def test_cursor_steps_and_adds_children():
+    trie = build({"00000000", "00000001"})
+    cursor = trie.cursor().step("00000000")
+    assert cursor.code == 0
+    assert cursor.step("1") is None
+    child = cursor.add_child("00000001", 7)
+    assert child.code == 7
+    assert trie.search("0000000000000001") == 7
+    # Um cursor no meio de uma aresta não tem código e pode criar o nó dessa posição
+    middle = trie.cursor().step("0000")
+    assert middle.code is None
+    assert middle.add_child("1", 8).code == 8
+    assert trie.search("00001") == 8 and trie.search("00000000") == 0
+
+
+def test_snapshot_restore_undoes_changes_and_keeps_cursors():
+    keys = random_keys(200)
+    trie = build(keys)
+    trie.snapshot()
+    cursors = {key: trie.cursor().step(key) for key in sorted(keys)[:20]}
+
+    for round_number in range(3):
+        extra = random_keys(200, seed=10 + round_number) - keys
+        for code, key in enumerate(sorted(extra), 1000):
+            trie.insert(key, code)
+        for key in sorted(keys)[20:40]:
+            trie.delete(key)
+        trie.search("0" * 30)
+        trie.restore()
+
+        assert trie.nodes_visited == 0
+        for code, key in enumerate(sorted(keys)):
+            assert trie.search(key) == code
+        for key in extra:
+            assert trie.search(key) is None
+        for key, cursor in cursors.items():
+            assert cursor.code == trie.search(key)
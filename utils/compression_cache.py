@@ -0,0 +1,101 @@
+import hashlib
+import os
+from collections import OrderedDict
+
+from LZW.container import FORMAT_VERSION
+
+DEFAULT_CACHE_SIZE = 256 << 20  # Limite padrão, em bytes, de cada nível do cache (memória e disco)
+
+
+class CompressionCache:
+    """Cache LRU de resultados de compressão e descompressão, endereçado pelo conteúdo.
+
+    A chave é o SHA-256 da entrada junto com os parâmetros que determinam a saída (operação,
+    max_bits, política, dicionário pré-definido e versão do formato), então uma entrada
+    repetida devolve o resultado gravado sem passar pelo codificador. Os resultados ficam
+    em memória e, com ``directory``, também em disco, um arquivo por chave, o que permite
+    reaproveitá-los entre execuções. Cada nível descarta os resultados usados há mais
+    tempo quando passa de ``max_size`` bytes; no disco, a ordem de uso é o mtime do arquivo.
+    """
+
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE, directory=None):
+        self.max_size = max_size
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # Chave -> resultado, do usado há mais tempo ao mais recente
+        self._size = 0  # Bytes dos resultados em memória
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(data, *parameters):
+        """Chave de ``data`` com os parâmetros que determinam o resultado."""
+        digest = hashlib.sha256(data)
+        digest.update(repr((FORMAT_VERSION,) + parameters).encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Retorna o resultado da chave (ou None) e atualiza os contadores de acertos e falhas."""
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        if self.directory is not None:
+            path = os.path.join(self.directory, key)
+            try:
+                if value is None:
+                    with open(path, "rb") as file:
+                        value = file.read()
+                    self._remember(key, value)
+                os.utime(path)  # Marca o arquivo como usado recentemente
+            except FileNotFoundError:
+                pass
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Guarda o resultado da chave; resultados maiores que o limite não são guardados."""
+        value = bytes(value)
+        if len(value) > self.max_size:
+            return
+        self._remember(key, value)
+        if self.directory is not None:
+            path = os.path.join(self.directory, key)
+            # Grava em um arquivo temporário e renomeia, para que outro processo nunca leia um resultado pela metade
+            temporary_path = f"{path}.{os.getpid()}.tmp"
+            with open(temporary_path, "wb") as file:
+                file.write(value)
+            os.replace(temporary_path, path)
+            self._evict_directory()
+
+    def _remember(self, key, value):
+        """Guarda o resultado em memória, descartando os usados há mais tempo até caber no limite."""
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size -= len(previous)
+        self._entries[key] = value
+        self._size += len(value)
+        while self._size > self.max_size:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def _evict_directory(self):
+        """Remove do diretório os resultados usados há mais tempo até o total caber no limite."""
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                status = entry.stat()
+                files.append((status.st_mtime, status.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # Já removido por outro processo
+            total -= size
@@ -1,23 +1,53 @@
+import cProfile
+import io
+import pstats
 import time
+from contextlib import nullcontext
+
+from LZW.stats import CodecStats
 
 class ReportManager:
-    """Classe para geração de relatórios de compressão e descompressão."""
+    """Classe para geração de relatórios de compressão e descompressão.
+
+    Com ``collect_stats`` o relatório inclui os contadores internos do codificador e do
+    decodificador (``stats``); com ``profile`` o trecho cronometrado roda sob o cProfile.
+    """
 
-    def __init__(self):
+    def __init__(self, collect_stats=False, profile=False):
+        self.stats = CodecStats() if collect_stats else None
+        self.profiler = cProfile.Profile() if profile else None
         self.start_time = None
         self.end_time = None
         self.compression_ratio = None
         self.decompression_ratio = None
         self.dictionary_size = None
+        self.block_ratio_loss = None
+        self.batch_results = []  # (arquivo, tamanho de entrada, tamanho de saída, erro) de cada arquivo de um lote
+        self.request_totals = {}  # Operação -> [requisições, erros, bytes de entrada, bytes de saída, espera, execução]
+        self.cache = None  # CompressionCache em uso, cujos acertos e falhas entram no relatório
 
     def start_timer(self):
         """Inicia o cronômetro para o cálculo do tempo de execução."""
         self.start_time = time.time()
+        if self.profiler is not None:
+            self.profiler.enable()
 
     def stop_timer(self):
         """Para o cronômetro e calcula o tempo de execução."""
+        if self.profiler is not None:
+            self.profiler.disable()
         self.end_time = time.time()
 
+    def phase(self, name):
+        """Mede o tempo de uma fase (leitura, codificação, escrita...) quando as estatísticas estão ativas."""
+        return self.stats.phase(name) if self.stats is not None else nullcontext()
+
+    def profile_report(self, limit=15):
+        """Retorna as funções com maior tempo acumulado no trecho perfilado."""
+        output = io.StringIO()
+        pstats.Stats(self.profiler, stream=output).sort_stats("cumulative").print_stats(limit)
+        return output.getvalue()
+
     def calculate_compression_ratio(self, original_size, compressed_size):
         """Calcula e armazena a taxa de compressão."""
         if compressed_size > 0:
@@ -32,11 +62,72 @@ class ReportManager:
         else:
             self.decompression_ratio = 0
             
+    def calculate_block_ratio_loss(self, original_size, blocks_size, stream_size):
+        """Calcula a perda percentual de taxa causada pelo dicionário novo em cada bloco."""
+        if original_size > 0 and blocks_size > 0 and stream_size > 0:
+            blocks_ratio = original_size / blocks_size
+            stream_ratio = original_size / stream_size
+            self.block_ratio_loss = (stream_ratio - blocks_ratio) / stream_ratio * 100
+        else:
+            self.block_ratio_loss = 0
+
+    def record_batch_file(self, path, input_size, output_size, error=None):
+        """Registra o resultado de um arquivo processado em lote."""
+        self.batch_results.append((path, input_size, output_size, error))
+
+    def log_batch_report(self, process_type="compression"):
+        """Exibe o resumo agregado de um lote: arquivos, erros, tamanhos totais e a taxa do lote inteiro."""
+        failures = [(path, error) for path, _, _, error in self.batch_results if error is not None]
+        input_size = sum(size for _, size, _, error in self.batch_results if error is None)
+        output_size = sum(size for _, _, size, error in self.batch_results if error is None)
+        print(f"Arquivos processados: {len(self.batch_results) - len(failures)} (com erro: {len(failures)})")
+        for path, error in failures:
+            print(f"  ERRO {path}: {error}")
+        print(f"Tamanho total de entrada: {input_size} bytes; de saída: {output_size} bytes")
+        if process_type == "compression":
+            self.calculate_compression_ratio(input_size, output_size)
+        else:
+            self.calculate_decompression_ratio(input_size, output_size)
+        self.log_report(process_type)
+
+    def record_request(self, operation, input_size, output_size, wait_time, work_time, error=None, verbose=False):
+        """Soma uma requisição do servidor aos totais da operação; com ``verbose`` também a exibe.
+
+        ``wait_time`` é o tempo na fila aguardando uma vaga e ``work_time`` o tempo de execução no pool.
+        """
+        totals = self.request_totals.setdefault(operation, [0, 0, 0, 0, 0.0, 0.0])
+        totals[0] += 1
+        totals[1] += error is not None
+        totals[2] += input_size
+        totals[3] += output_size
+        totals[4] += wait_time
+        totals[5] += work_time
+        if verbose:
+            outcome = f"ERRO {error}" if error is not None else f"{input_size} -> {output_size} bytes"
+            print(f"{operation}: {outcome}, espera {wait_time:.4f} s, execução {work_time:.4f} s")
+
+    def log_server_report(self):
+        """Exibe os totais das requisições atendidas por operação."""
+        for operation, (count, errors, input_size, output_size, wait_time, work_time) in self.request_totals.items():
+            print(f"{operation}: {count} requisições ({errors} com erro), {input_size} -> {output_size} bytes, "
+                  f"espera média {wait_time / count:.4f} s, execução média {work_time / count:.4f} s")
+
     def log_report(self, process_type="compression"):
         """Exibe as estatísticas do processo."""
         print(f"Tempo de execução: {self.end_time - self.start_time:.4f} segundos")
         
         if process_type == "compression":
             print(f"Taxa de compressão: {self.compression_ratio:.4f}")
+            if self.block_ratio_loss is not None:
+                print(f"Perda de taxa pelos blocos independentes: {self.block_ratio_loss:.2f}%")
         elif process_type == "decompression":
             print(f"Taxa de descompressão: {self.decompression_ratio:.4f}")
+
+        if self.cache is not None:
+            print(f"Cache: {self.cache.hits} acertos, {self.cache.misses} falhas")
+        if self.stats is not None:
+            print("Estatísticas:")
+            for name, value in self.stats.as_dict().items():
+                print(f"  {name}: {value}")
+        if self.profiler is not None:
+            print(self.profile_report())
@@ -1,38 +1,176 @@
 # utils.py
-from struct import pack, unpack
+import glob
+import mmap
+import os
+from contextlib import contextmanager
+
+from LZW.lzw_encoder import LZWEncoder
+from LZW.lzw_decoder import DEFAULT_BACKEND, LZWDecoder
+from LZW.bit_stream import STORED_MAX_BITS, BitReader, BitWriter, pack_codes, unpack_codes
+from LZW.container import HEADER_SIZE, content_checksum, pack_header, unpack_header, verify_content
+from LZW.dictionary_policy import FREEZE, clear_code_for, first_code_for
+from LZW.preset_dictionary import preset_size, resolve_preset
+
+CHUNK_SIZE = 1 << 16  # Tamanho padrão dos blocos lidos no modo streaming
+WRITE_BUFFER_SIZE = 1 << 20  # Bytes acumulados antes de cada escrita no arquivo compresso
+
+def _has_glob_magic(pattern):
+    """Indica se o caminho tem curingas de glob."""
+    return any(char in pattern for char in "*?[")
+
+def expand_inputs(patterns):
+    """Expande caminhos de arquivos, diretórios (recursivamente) e padrões glob em pares (caminho, nome relativo).
+
+    O nome relativo preserva a estrutura abaixo do diretório informado (ou da parte fixa do
+    padrão glob), para que a saída de um lote reproduza a árvore de entrada. Caminhos de
+    arquivo são mantidos mesmo que não existam, para que o erro apareça no relatório.
+    """
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            base = pattern
+            matches = sorted(os.path.join(root, name) for root, _, names in os.walk(pattern) for name in names)
+        elif _has_glob_magic(pattern):
+            # Base: os componentes do caminho antes do primeiro curinga
+            parts = pattern.split(os.sep)
+            fixed = []
+            for part in parts:
+                if _has_glob_magic(part):
+                    break
+                fixed.append(part)
+            base = os.sep.join(fixed)
+            matches = sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+        else:
+            base = os.path.dirname(pattern)
+            matches = [pattern]
+        files.extend((path, os.path.relpath(path, base or os.curdir)) for path in matches)
+    return files
 
 def read_file(filepath):
-    """Lê o conteúdo do arquivo e retorna como string."""
-    if ".bin" in filepath or ".bmp" in filepath:
-        with open(filepath, "rb") as file:
-            return file.read()
-    else:
-        with open(filepath, "r") as file:
-            return file.read()
+    """Lê o conteúdo do arquivo e retorna como bytes, qualquer que seja o tipo do arquivo."""
+    with open(filepath, "rb") as file:
+        return file.read()
     
-def read_compressed_file(filepath):
-    """Lê o conteúdo do arquivo compresso e retorna como lista de códigos binários."""
-    codes = []
+@contextmanager
+def map_file(filepath):
+    """Mapeia o arquivo em memória, somente leitura, e fornece um memoryview sem cópia do conteúdo.
+
+    Visões derivadas do memoryview (fatias, arrays NumPy) devem ser liberadas antes do fim do bloco.
+    """
+    with open(filepath, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            yield memoryview(b"")  # mmap não aceita arquivos vazios
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+            yield view
+
+def read_compressed_header(filepath):
+    """Lê apenas o cabeçalho do arquivo compresso."""
+    with open(filepath, "rb") as file:
+        return unpack_header(file.read(HEADER_SIZE))
+
+def _first_code(max_bits, policy, preset):
+    """Primeiro código livre do fluxo, que define a largura inicial dos códigos empacotados."""
+    return first_code_for(policy) + preset_size(preset, max_bits, policy)
+
+def read_compressed_file(filepath, preset=None):
+    """Lê o arquivo compresso e retorna a lista de códigos e o cabeçalho (max_bits e política usados).
+
+    O arquivo é mapeado em memória e os códigos são desempacotados em lote direto do mapeamento.
+    Se o cabeçalho indica um dicionário pré-definido, ``preset`` deve ser esse dicionário.
+    """
+    with map_file(filepath) as view:
+        header = unpack_header(view)
+        preset = resolve_preset(header.preset_id, preset)
+        with view[HEADER_SIZE:] as body:
+            codes = unpack_codes(body, header.max_bits, _first_code(header.max_bits, header.policy, preset),
+                                 clear_code_for(header.policy))
+    return codes, header
+
+def read_file_chunks(filepath, chunk_size=CHUNK_SIZE):
+    """Lê o arquivo em blocos binários de tamanho fixo, sem carregá-lo inteiro na memória."""
     with open(filepath, "rb") as file:
         while True:
-            data = file.read(2)
-            if not data:
+            chunk = file.read(chunk_size)
+            if not chunk:
                 break
-            (code, ) = unpack('>H', data)
+            yield chunk
 
-            codes.append(code)
-        return codes
+def read_compressed_chunks(filepath, chunk_size=CHUNK_SIZE, preset=None):
+    """Lê o arquivo compresso em blocos e produz listas de códigos à medida que são lidos."""
+    with open(filepath, "rb") as file:
+        header = unpack_header(file.read(HEADER_SIZE))
+        preset = resolve_preset(header.preset_id, preset)
+        reader = BitReader(header.max_bits, _first_code(header.max_bits, header.policy, preset),
+                           clear_code_for(header.policy))
+        while True:
+            data = file.read(chunk_size)
+            if not data:
+                break
+            yield reader.read(data)
 
 def write_file(filepath, data):
-    """Escreve o conteúdo fornecido no arquivo."""
-    with open(filepath, "w") as file:
+    """Escreve os bytes fornecidos no arquivo."""
+    with open(filepath, "wb") as file:
         file.write(data)
 
-def write_compressed_file(filepath, data):
-    """Escreve o conteúdo comprimido no arquivo."""
+def write_compressed_file(filepath, data, max_bits, policy=FREEZE, preset=None, original_size=0, checksum=0):
+    """Escreve o cabeçalho e os códigos empacotados em largura variável (9 bits até max_bits).
+
+    ``original_size`` e ``checksum`` (CRC32) descrevem o conteúdo original e são conferidos na descompressão.
+    """
+    # Bytes crus: cada byte é um código (armazenados como estão quando max_bits é STORED_MAX_BITS)
+    codes = data if isinstance(data, list) or max_bits == STORED_MAX_BITS else list(data)
     with open(filepath, "wb") as file:
-        for code in data:
-            if isinstance(code, int):
-                file.write(pack('>H', code))
-            else:
-                file.write(pack('>H', int(ord(code))))
+        file.write(pack_header(max_bits, policy, preset.id if preset is not None else 0, original_size, checksum))
+        file.write(pack_codes(codes, max_bits, _first_code(max_bits, policy, preset), clear_code_for(policy)))
+
+def write_compressed_stream(filepath, code_chunks, max_bits, policy=FREEZE, preset=None, content=None):
+    """Escreve o cabeçalho e empacota incrementalmente os blocos de códigos produzidos por um gerador.
+
+    ``content`` (um ContentChecksum) acumula o conteúdo original enquanto os códigos são
+    gerados; no fim, o tamanho e o CRC32 dele são gravados no cabeçalho. Retorna o número
+    de bytes escritos.
+    """
+    writer = BitWriter(max_bits, _first_code(max_bits, policy, preset), clear_code_for(policy))
+    buffer = bytearray(pack_header(max_bits, policy, preset.id if preset is not None else 0))
+    size = 0
+    with open(filepath, "wb") as file:
+        for codes in code_chunks:
+            # Os códigos são empacotados direto no buffer, que só vai para o arquivo em blocos grandes
+            writer.write(codes, buffer)
+            if len(buffer) >= WRITE_BUFFER_SIZE:
+                size += file.write(buffer)
+                del buffer[:]
+        buffer += writer.flush()
+        size += file.write(buffer)
+        if content is not None:
+            file.seek(0)
+            file.write(pack_header(max_bits, policy, preset.id if preset is not None else 0, content.size, content.checksum))
+    return size
+
+def compress_bytes(data, max_bits=12, policy=FREEZE, encoder=None):
+    """Comprime bytes em memória e retorna o conteúdo completo de um arquivo .lzw (cabeçalho e códigos).
+
+    ``encoder`` reaproveita um LZWEncoder já criado; nesse caso, max_bits, a política e o
+    dicionário pré-definido são os dele.
+    """
+    if encoder is None:
+        encoder = LZWEncoder(max_bits, policy=policy)
+    codes = encoder.compress(data)
+    codes = codes if isinstance(codes, list) or encoder.max_bits == STORED_MAX_BITS else list(codes)
+    preset_id = encoder.preset.id if encoder.preset is not None else 0
+    header = pack_header(encoder.max_bits, encoder.policy, preset_id, len(data), content_checksum(data))
+    return header + pack_codes(codes, encoder.max_bits, encoder.first_code, clear_code_for(encoder.policy))
+
+def decompress_bytes(compressed, preset=None, backend=DEFAULT_BACKEND):
+    """Descomprime o conteúdo de um arquivo .lzw mantido em memória e confere o tamanho e o CRC32."""
+    header = unpack_header(compressed)
+    preset = resolve_preset(header.preset_id, preset)
+    with memoryview(compressed)[HEADER_SIZE:] as body:
+        codes = unpack_codes(body, header.max_bits, _first_code(header.max_bits, header.policy, preset),
+                             clear_code_for(header.policy))
+    data = LZWDecoder(header.max_bits, policy=header.policy, backend=backend, preset=preset).decompress(
+        codes, header.original_size)
+    verify_content(header, len(data), content_checksum(data))
+    return bytes(data)